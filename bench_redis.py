@@ -0,0 +1,133 @@
+"""
+Benchmark for the redis_operations variants in script_benchify.py.
+
+Runs the greeting/visitor-counter workflow from several threads and reports
+calls/sec and p50/p99 latency for:
+
+    per-call   a new redis.Redis client (and TCP connection) per call, as before
+    pooled     redis_operations() on the shared connection pool
+    pipelined  redis_operations_pipelined() on the shared pool (one round-trip)
+
+and, with N coroutines started at once on one event loop:
+
+    to_thread        redis_operations() offloaded with asyncio.to_thread
+    async            redis_operations_async() on the loop's async pool
+    async-pipelined  redis_operations_pipelined_async()
+
+Point it at a local redis-server with --url, or pass --fake to start an
+in-process TCP stand-in (requires the fakeredis package). The stand-in shares
+the interpreter, and so the CPU, with the client, so it understates the
+gains a real server shows; use it to compare variants, not absolute rates.
+
+Usage:
+    python bench_redis.py --url redis://localhost:6379/0 --calls 2000 --threads 8
+    python bench_redis.py --fake --calls 2000 --threads 8
+    python bench_redis.py --fake --mode async --coroutines 10000
+"""
+import argparse
+import asyncio
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import redis
+
+import script_benchify
+
+def start_fake_server():
+    """Starts a fakeredis TCP server on a free port; returns its URL."""
+    from fakeredis import TcpFakeServer
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    server = TcpFakeServer(('127.0.0.1', port))
+    server.daemon_threads = True
+    # Like redis-server; accepted sockets inherit it, so pipelined replies
+    # are not held back by Nagle's algorithm
+    server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'redis://127.0.0.1:{port}/0'
+
+def run(operation, calls, threads):
+    def timed(_):
+        start = time.perf_counter()
+        operation()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(timed, range(calls)))
+    return calls / (time.perf_counter() - start), latencies
+
+async def run_async(operation, coroutines):
+    async def timed():
+        start = time.perf_counter()
+        await operation()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*[timed() for _ in range(coroutines)])
+    return coroutines / (time.perf_counter() - start), latencies
+
+async def bench_async(url, coroutines, connections):
+    # Waiting for a connection is expected at this concurrency, so no pool timeout
+    script_benchify.set_async_connection_pool(
+        script_benchify.create_async_connection_pool(url, max_connections=connections, timeout=3600))
+    variants = {
+        'to_thread': lambda: asyncio.to_thread(script_benchify.redis_operations),
+        'async': script_benchify.redis_operations_async,
+        'async-pipelined': script_benchify.redis_operations_pipelined_async,
+    }
+    for name, operation in variants.items():
+        await operation()
+        rate, latencies = await run_async(operation, coroutines)
+        report(name, rate, latencies)
+    await script_benchify.get_async_connection_pool().disconnect()
+
+def report(name, rate, latencies):
+    print(f"{name:>15}: {rate:10.0f} calls/s  p50 {np.percentile(latencies, 50) * 1000:8.3f} ms  "
+          f"p99 {np.percentile(latencies, 99) * 1000:8.3f} ms")
+
+def bench_sync(url, calls, threads):
+    def per_call():
+        client = redis.Redis.from_url(url)
+        try:
+            script_benchify.redis_operations(client)
+        finally:
+            client.close()
+
+    variants = {
+        'per-call': per_call,
+        'pooled': script_benchify.redis_operations,
+        'pipelined': script_benchify.redis_operations_pipelined,
+    }
+    for name, operation in variants.items():
+        operation()  # warm up (and open the pooled connections)
+        rate, latencies = run(operation, calls, threads)
+        report(name, rate, latencies)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--url', default=script_benchify.REDIS_URL, help='Redis server URL')
+    parser.add_argument('--fake', action='store_true', help='start an in-process fakeredis TCP server')
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8, help='threads, and connections per pool')
+    parser.add_argument('--coroutines', type=int, default=10000, help='concurrent coroutines in async mode')
+    parser.add_argument('--mode', choices=['sync', 'async', 'both'], default='both')
+    args = parser.parse_args(argv)
+
+    url = start_fake_server() if args.fake else args.url
+    script_benchify.set_connection_pool(script_benchify.create_connection_pool(
+        url, max_connections=args.threads, timeout=3600))
+    if args.mode in ('sync', 'both'):
+        bench_sync(url, args.calls, args.threads)
+    if args.mode in ('async', 'both'):
+        asyncio.run(bench_async(url, args.coroutines, args.threads))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
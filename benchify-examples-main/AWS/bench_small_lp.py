@@ -0,0 +1,69 @@
+"""
+Checks solve_small_lps() against pulp/CBC and compares their speed.
+
+Random production LPs with 2-3 products and a few resources are solved both
+ways; some coefficients and capacities are negative so that infeasible and
+unbounded instances are covered too. Every instance where the status or the
+objective differs is reported.
+
+Usage:
+    python bench_small_lp.py --instances 300
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pulp
+
+import script
+
+def random_instances(count, n, m, rng):
+    profit = rng.integers(-5, 50, (count, n)).astype(float)
+    usage = rng.integers(-2, 10, (count, m, n)).astype(float)
+    capacity = rng.integers(-20, 200, (count, m)).astype(float)
+    return profit, usage, capacity
+
+def solve_with_pulp(profit, usage, capacity):
+    statuses, objectives = [], []
+    solver = pulp.PULP_CBC_CMD(msg=False)
+    for c, a, b in zip(profit, usage, capacity):
+        model = script.ProductionModel([f"x{i}" for i in range(len(c))], c,
+                                       [f"r{j}" for j in range(len(b))], a, b, solver=solver, fast_path=False)
+        result = model.solve()
+        statuses.append(result['status'])
+        objectives.append(result['total_profit'] if result['status'] == 'Optimal' else np.nan)
+    return np.array(statuses), np.array(objectives, dtype=float)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--instances', type=int, default=300, help='instances per problem size')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    mismatches = 0
+    for n, m in ((2, 2), (2, 4), (3, 3), (3, 5)):
+        profit, usage, capacity = random_instances(args.instances, n, m, rng)
+
+        start = time.perf_counter()
+        fast = script.solve_small_lps(profit, usage, capacity)
+        fast_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        statuses, objectives = solve_with_pulp(profit, usage, capacity)
+        pulp_time = time.perf_counter() - start
+
+        differ = (fast['status'] != statuses) | ~np.isclose(
+            np.nan_to_num(fast['total_profit'], nan=0.0), np.nan_to_num(objectives, nan=0.0), rtol=1e-5, atol=1e-4)
+        mismatches += int(differ.sum())
+        for i in np.flatnonzero(differ)[:5]:
+            print(f"  {n}x{m} instance {i}: fast={fast['status'][i]} {fast['total_profit'][i]} "
+                  f"pulp={statuses[i]} {objectives[i]}")
+        counts = {str(status): int((statuses == status).sum()) for status in np.unique(statuses)}
+        print(f"{n} products x {m} resources: {int(differ.sum())}/{args.instances} differ {counts}  "
+              f"fast {args.instances / fast_time:10.0f} LPs/s  pulp {args.instances / pulp_time:8.1f} LPs/s")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
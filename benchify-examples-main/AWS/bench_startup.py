@@ -0,0 +1,51 @@
+"""
+Cold-start benchmark for script.py.
+
+Each scenario runs in a fresh interpreter, so nothing is cached in-process
+between runs. "eager" reproduces the old behaviour of building the CloudWatch
+and Kinesis clients at import time; "import" is what a caller that only needs
+optimize_production's math now pays.
+
+Usage:
+    python bench_startup.py --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    'import': "import script",
+    'first_client': "import script; script.get_cloudwatch_client()",
+    'eager': "import script, boto3; boto3.client('cloudwatch'); boto3.client('kinesis')",
+}
+
+def time_scenario(code, runs):
+    env = dict(os.environ)
+    # Client construction only needs a region, not credentials
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    here = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=here, env=env, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters per scenario')
+    args = parser.parse_args(argv)
+
+    baseline = statistics.median(time_scenario('pass', args.runs))
+    print(f"{'interpreter':>12}: median {baseline * 1000:8.1f} ms")
+    for name, code in SCENARIOS.items():
+        times = time_scenario(code, args.runs)
+        median = statistics.median(times)
+        print(f"{name:>12}: median {median * 1000:8.1f} ms  min {min(times) * 1000:8.1f} ms  "
+              f"(+{(median - baseline) * 1000:.1f} ms over a bare interpreter)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Throughput benchmark for the telemetry helpers, run against fake_aws.
+
+For each service it sends the same events through the single-call path
+(one API call per event), the batched path (MetricPublisher, KinesisProducer,
+CloudWatchLogsHandler) and the asyncio path, and reports events/sec
+including the final flush, the caller-visible latency per event (p50/p99;
+for Kinesis batches, until the record's Future resolves) and how many events
+were lost to errors (for the batched paths, the events in requests that were
+dropped after all retries, not the number of failed requests).
+
+Usage:
+    python bench_telemetry.py --events 2000 --latency 0.005 --throttle 0.01
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+import numpy as np
+
+import script
+from fake_aws import FakeAWS
+
+STREAM_NAME = 'BenchStream'
+LOG_GROUP = 'BenchLogs'
+LOG_STREAM = 'bench'
+
+def _single(send, events):
+    latencies, errors = [], 0
+    for i in range(events):
+        start = time.perf_counter()
+        try:
+            send(i)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+def _async(send, events):
+    async def one(i):
+        start = time.perf_counter()
+        try:
+            await send(i)
+            return time.perf_counter() - start, 0
+        except Exception:
+            return time.perf_counter() - start, 1
+
+    async def run():
+        return await asyncio.gather(*[one(i) for i in range(events)])
+
+    results = asyncio.run(run())
+    return [latency for latency, _ in results], sum(error for _, error in results)
+
+def metrics_single(aws, events):
+    client = aws.client('cloudwatch')
+    return _single(lambda i: script.put_metric_data('BenchMetric', i, 'Count', client=client), events)
+
+def metrics_batched(aws, events):
+    publisher = script.MetricPublisher(client=aws.client('cloudwatch'), max_age=0.05, backoff=0.01)
+    latencies, errors = _single(lambda i: publisher.put('BenchMetric', i, 'Count'), events)
+    publisher.close()
+    return latencies, errors + publisher.dropped_points
+
+def metrics_async(aws, events):
+    client = aws.client('cloudwatch')
+    return _async(lambda i: script.put_metric_data_async('BenchMetric', i, 'Count', client=client), events)
+
+def kinesis_single(aws, events):
+    client = aws.client('kinesis')
+    return _single(lambda i: script.put_record_to_kinesis(STREAM_NAME, {'event': i}, client=client), events)
+
+def kinesis_batched(aws, events):
+    producer = script.KinesisProducer(STREAM_NAME, client=aws.client('kinesis'), max_age=0.05, backoff=0.01)
+    latencies = []
+    futures = []
+    for i in range(events):
+        start = time.perf_counter()
+        future = producer.put({'event': i})
+        future.add_done_callback(lambda future, start=start: latencies.append(time.perf_counter() - start))
+        futures.append(future)
+    producer.close()
+    return latencies, sum(1 for future in futures if future.exception() is not None)
+
+def kinesis_async(aws, events):
+    client = aws.client('kinesis')
+    return _async(lambda i: script.put_record_to_kinesis_async(STREAM_NAME, {'event': i}, client=client), events)
+
+def logs_single(aws, events):
+    client = aws.client('logs')
+    return _single(lambda i: script._put_log_event(LOG_GROUP, LOG_STREAM, f'event {i}', client=client), events)
+
+def logs_batched(aws, events):
+    handler = script.CloudWatchLogsHandler(client=aws.client('logs'), max_age=0.05, backoff=0.01)
+    latencies, errors = _single(lambda i: handler.append(LOG_GROUP, LOG_STREAM, f'event {i}'), events)
+    handler.close()
+    return latencies, errors + handler.dropped_events
+
+def logs_async(aws, events):
+    client = aws.client('logs')
+    return _async(lambda i: script.log_to_cloudwatch_async(LOG_GROUP, LOG_STREAM, f'event {i}', client=client),
+                  events)
+
+SCENARIOS = {
+    'metrics': {'single': metrics_single, 'batched': metrics_batched, 'async': metrics_async},
+    'kinesis': {'single': kinesis_single, 'batched': kinesis_batched, 'async': kinesis_async},
+    'logs': {'single': logs_single, 'batched': logs_batched, 'async': logs_async},
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--events', type=int, default=2000, help='events per scenario')
+    parser.add_argument('--latency', type=float, default=0.005, help='seconds per fake API call')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random seconds per fake API call')
+    parser.add_argument('--throttle', type=float, default=0.0, help='probability an API call is throttled')
+    parser.add_argument('--services', default=','.join(SCENARIOS), help='comma-separated subset of services')
+    parser.add_argument('--paths', default='single,batched,async', help='comma-separated subset of paths')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # The batched paths log every failed request; keep the report readable
+    logging.getLogger(script.__name__).setLevel(logging.CRITICAL)
+    for service in args.services.split(','):
+        for path in args.paths.split(','):
+            aws = FakeAWS(latency=args.latency, jitter=args.jitter, throttle_rate=args.throttle, seed=args.seed)
+            start = time.perf_counter()
+            latencies, errors = SCENARIOS[service][path](aws, args.events)
+            elapsed = time.perf_counter() - start
+            calls = sum(count for operation, count in aws.stats.items() if '.' not in operation
+                        and operation[0].isupper())
+            print(f"{service:>8} {path:>8}: {args.events / elapsed:10.0f} events/s  "
+                  f"p50 {np.percentile(latencies, 50) * 1000:8.3f} ms  "
+                  f"p99 {np.percentile(latencies, 99) * 1000:8.3f} ms  "
+                  f"{calls:6d} API calls  {errors:5d} lost")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+In-process stand-in for the CloudWatch, CloudWatch Logs and Kinesis APIs used by script.py.
+
+The fake clients accept the same keyword arguments as their boto3
+counterparts, enforce the documented per-request limits, and can simulate
+network latency and throttling. Errors are raised as botocore ClientError,
+with the error codes AWS uses, so retry and error handling can be exercised
+without live AWS.
+
+Example:
+    fake = FakeAWS(latency=0.005, throttle_rate=0.01)
+    with fake.installed():
+        script.put_metric_data('MyCustomMetric', 42, 'Count')
+    print(fake.stats)
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from botocore.exceptions import ClientError
+
+import script
+
+KINESIS_MAX_RECORDS = 500
+KINESIS_MAX_RECORD_BYTES = 1024 * 1024
+KINESIS_MAX_REQUEST_BYTES = 5 * 1024 * 1024
+METRICS_MAX_DATUMS = 1000
+METRICS_MAX_VALUES = 150
+METRICS_MAX_REQUEST_BYTES = 1000000
+LOGS_MAX_EVENTS = 10000
+LOGS_MAX_REQUEST_BYTES = 1048576
+LOGS_EVENT_OVERHEAD_BYTES = 26
+LOGS_MAX_SPAN_MS = 24 * 60 * 60 * 1000
+
+def _error(code, message, operation):
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+class FakeAWS:
+    """
+    Shared state and fault injection for the fake clients.
+
+    Args:
+        latency: Seconds each API call takes (sleeps, so threads overlap as they would on a network)
+        jitter: Extra random latency of up to this many seconds per call
+        throttle_rate: Probability that a whole call fails with a throttling error
+        record_throttle_rate: Probability that an individual PutRecords entry fails
+        shards: Shards per Kinesis stream
+        seed: Seed for the fault injection
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, throttle_rate=0.0, record_throttle_rate=0.0, shards=4, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.record_throttle_rate = record_throttle_rate
+        self.shards = shards
+        self.metrics = defaultdict(list)
+        self.log_events = defaultdict(list)
+        self.records = defaultdict(list)
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def client(self, service_name):
+        """Fake client for 'cloudwatch', 'logs' or 'kinesis'; usable as script.set_client_factory(fake.client)"""
+        clients = {'cloudwatch': FakeCloudWatch, 'logs': FakeLogs, 'kinesis': FakeKinesis}
+        if service_name not in clients:
+            raise ValueError(f"No fake for {service_name!r}")
+        return clients[service_name](self)
+
+    @contextmanager
+    def installed(self):
+        """Route script.py's shared clients to this fake for the duration of the block"""
+        script.set_client_factory(self.client)
+        try:
+            yield self
+        finally:
+            script.set_client_factory(None)
+
+    def _call(self, operation, throttle_code):
+        delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self.stats[operation] += 1
+            throttled = self.throttle_rate and self._random.random() < self.throttle_rate
+            if throttled:
+                self.stats[f'{operation}.throttled'] += 1
+        if throttled:
+            raise _error(throttle_code, 'Rate exceeded', operation)
+
+class FakeCloudWatch:
+    def __init__(self, aws):
+        self.aws = aws
+
+    def put_metric_data(self, Namespace, MetricData):
+        self.aws._call('PutMetricData', 'Throttling')
+        if not MetricData or len(MetricData) > METRICS_MAX_DATUMS:
+            raise _error('InvalidParameterValue', f'MetricData must hold 1 to {METRICS_MAX_DATUMS} items',
+                         'PutMetricData')
+        if len(json.dumps(MetricData, default=str)) > METRICS_MAX_REQUEST_BYTES:
+            raise _error('RequestEntityTooLarge', 'Request size exceeds 1 MB', 'PutMetricData')
+        for datum in MetricData:
+            values = datum.get('Values')
+            if values is not None:
+                if len(values) > METRICS_MAX_VALUES:
+                    raise _error('InvalidParameterValue', f'Values can hold at most {METRICS_MAX_VALUES} items',
+                                 'PutMetricData')
+                if 'Counts' in datum and len(datum['Counts']) != len(values):
+                    raise _error('InvalidParameterCombination', 'Values and Counts must have the same length',
+                                 'PutMetricData')
+        with self.aws._lock:
+            self.aws.metrics[Namespace].extend(MetricData)
+            self.aws.stats['metric_datums'] += len(MetricData)
+        return {}
+
+class FakeLogs:
+    def __init__(self, aws):
+        self.aws = aws
+
+    def put_log_events(self, logGroupName, logStreamName, logEvents, **kwargs):
+        self.aws._call('PutLogEvents', 'ThrottlingException')
+        if not logEvents or len(logEvents) > LOGS_MAX_EVENTS:
+            raise _error('InvalidParameterException', f'logEvents must hold 1 to {LOGS_MAX_EVENTS} items',
+                         'PutLogEvents')
+        size = sum(len(event['message'].encode('utf-8')) + LOGS_EVENT_OVERHEAD_BYTES for event in logEvents)
+        if size > LOGS_MAX_REQUEST_BYTES:
+            raise _error('InvalidParameterException', 'Batch size exceeds 1,048,576 bytes', 'PutLogEvents')
+        timestamps = [event['timestamp'] for event in logEvents]
+        if timestamps != sorted(timestamps):
+            raise _error('InvalidParameterException', 'Log events must be in chronological order', 'PutLogEvents')
+        if timestamps[-1] - timestamps[0] > LOGS_MAX_SPAN_MS:
+            raise _error('InvalidParameterException', 'A batch cannot span more than 24 hours', 'PutLogEvents')
+        with self.aws._lock:
+            self.aws.log_events[(logGroupName, logStreamName)].extend(logEvents)
+            self.aws.stats['log_events'] += len(logEvents)
+        return {'nextSequenceToken': str(len(self.aws.log_events[(logGroupName, logStreamName)]))}
+
+class FakeKinesis:
+    def __init__(self, aws):
+        self.aws = aws
+
+    def _store(self, stream_name, data, partition_key):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        shard = int(hashlib.md5(partition_key.encode('utf-8')).hexdigest(), 16) % self.aws.shards
+        with self.aws._lock:
+            self.aws._sequence += 1
+            sequence_number = f'{self.aws._sequence:056d}'
+            self.aws.records[stream_name].append((shard, sequence_number, partition_key, data))
+            self.aws.stats['kinesis_records'] += 1
+        return {'ShardId': f'shardId-{shard:012d}', 'SequenceNumber': sequence_number}
+
+    @staticmethod
+    def _size(data, partition_key):
+        return len(data.encode('utf-8') if isinstance(data, str) else data) + len(partition_key.encode('utf-8'))
+
+    def put_record(self, StreamName, Data, PartitionKey, **kwargs):
+        self.aws._call('PutRecord', 'ProvisionedThroughputExceededException')
+        if self._size(Data, PartitionKey) > KINESIS_MAX_RECORD_BYTES:
+            raise _error('ValidationException', 'Record exceeds 1 MiB', 'PutRecord')
+        return self._store(StreamName, Data, PartitionKey)
+
+    def put_records(self, StreamName, Records, **kwargs):
+        self.aws._call('PutRecords', 'ProvisionedThroughputExceededException')
+        if not Records or len(Records) > KINESIS_MAX_RECORDS:
+            raise _error('ValidationException', f'Records must hold 1 to {KINESIS_MAX_RECORDS} items', 'PutRecords')
+        sizes = [self._size(record['Data'], record['PartitionKey']) for record in Records]
+        if max(sizes) > KINESIS_MAX_RECORD_BYTES:
+            raise _error('ValidationException', 'Record exceeds 1 MiB', 'PutRecords')
+        if sum(sizes) > KINESIS_MAX_REQUEST_BYTES:
+            raise _error('InvalidArgumentException', 'Request exceeds 5 MiB', 'PutRecords')
+        results = []
+        for record in Records:
+            with self.aws._lock:
+                failed = self.aws.record_throttle_rate and self.aws._random.random() < self.aws.record_throttle_rate
+            if failed:
+                results.append({'ErrorCode': 'ProvisionedThroughputExceededException',
+                                'ErrorMessage': 'Rate exceeded for shard'})
+            else:
+                results.append(self._store(StreamName, record['Data'], record['PartitionKey']))
+        failed_count = sum(1 for result in results if 'ErrorCode' in result)
+        if failed_count:
+            with self.aws._lock:
+                self.aws.stats['kinesis_records.throttled'] += failed_count
+        return {'FailedRecordCount': failed_count, 'Records': results}
@@ -1,17 +1,323 @@
-import boto3
 import json
+import numpy as np
 import pulp
 from datetime import datetime, timezone
 import time
+import asyncio
+import atexit
+import functools
+import itertools
+import logging
+import math
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 
-# Initialize AWS clients
-cloudwatch = boto3.client('cloudwatch')
-kinesis = boto3.client('kinesis')
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
-def put_metric_data(metric_name, value, unit):
-    """Put custom metric data to CloudWatch"""
+logger = logging.getLogger(__name__)
 
-    cloudwatch.put_metric_data(
+# AWS clients are created on first use, so importing this module neither
+# loads botocore's service models nor needs credentials
+_clients = {}
+_clients_lock = threading.Lock()
+_client_factory = None
+
+def set_client_factory(factory):
+    """Build clients with factory(service_name) instead of boto3.client; None restores the default
+
+    Clients already created are discarded.
+    """
+    global _client_factory
+    with _clients_lock:
+        _client_factory = factory
+        _clients.clear()
+
+def get_client(service_name):
+    """Shared, thread-safe client for an AWS service, created on first use"""
+    client = _clients.get(service_name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(service_name)
+            if client is None:
+                if _client_factory is None:
+                    import boto3
+                    client = boto3.client(service_name)
+                else:
+                    client = _client_factory(service_name)
+                _clients[service_name] = client
+    return client
+
+def get_cloudwatch_client():
+    return get_client('cloudwatch')
+
+def get_kinesis_client():
+    return get_client('kinesis')
+
+def get_logs_client():
+    return get_client('logs')
+
+def __getattr__(name):
+    # The module used to expose eagerly created `cloudwatch` and `kinesis` clients
+    if name == 'cloudwatch':
+        return get_cloudwatch_client()
+    if name == 'kinesis':
+        return get_kinesis_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Error codes AWS returns for requests that may succeed if repeated: throttling
+# and transient service-side failures
+RETRYABLE_ERROR_CODES = frozenset({
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'TooManyRequestsException',
+    'RequestLimitExceeded', 'ProvisionedThroughputExceededException', 'LimitExceededException',
+    'ServiceUnavailable', 'ServiceUnavailableException', 'InternalFailure', 'InternalServiceError',
+    'RequestTimeout', 'RequestTimeoutException',
+})
+
+def _is_retryable(error):
+    """Whether a failed AWS call may succeed if repeated: throttling, 5xx and connection errors"""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        code = response.get('Error', {}).get('Code', '')
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return code in RETRYABLE_ERROR_CODES or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        from botocore.exceptions import ConnectionError as BotocoreConnectionError, HTTPClientError
+    except ImportError:
+        return False
+    return isinstance(error, (BotocoreConnectionError, HTTPClientError))
+
+# Error codes AWS returns for malformed requests; repeating them cannot succeed
+VALIDATION_ERROR_CODES = frozenset({
+    'ValidationException', 'ValidationError', 'InvalidArgumentException', 'InvalidParameterException',
+    'InvalidParameterValue', 'InvalidParameterCombination', 'MissingParameter', 'RequestEntityTooLarge',
+    'SerializationException',
+})
+
+def _is_validation_error(error):
+    """Whether AWS (or botocore's own parameter check) rejected a request as invalid"""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        code = response.get('Error', {}).get('Code', '')
+        return code in VALIDATION_ERROR_CODES or code.startswith('InvalidParameter')
+    try:
+        from botocore.exceptions import ParamValidationError
+    except ImportError:
+        return False
+    return isinstance(error, ParamValidationError)
+
+# PutMetricData limits
+MAX_METRIC_DATA_PER_REQUEST = 1000
+MAX_VALUES_PER_DATUM = 150
+MAX_METRIC_REQUEST_BYTES = 1000000
+
+class MetricPublisher:
+    """Buffer CloudWatch metric data points and send them in as few PutMetricData calls as possible
+
+    put() only appends to an in-memory buffer. Points with the same name,
+    unit, dimensions and timestamp bucket (one minute, or one second for
+    high-resolution metrics) are aggregated: with aggregate='values' into
+    Values/Counts datums of up to 150 distinct values each (lossless), with
+    aggregate='statistics' into a single StatisticValues datum, and with
+    aggregate=None not at all. A background thread flushes when the buffer
+    holds max_batch_size datums, when the oldest point is max_age seconds
+    old, and on close() / interpreter exit. A request that is throttled or
+    fails on the service side is retried with exponential backoff and
+    jitter, up to max_retries times, before its datums are dropped.
+
+    The client is any object with a boto3-style put_metric_data method, so
+    a local stub can stand in for CloudWatch.
+    """
+
+    def __init__(self, client=None, namespace='CustomMetrics', max_batch_size=MAX_METRIC_DATA_PER_REQUEST,
+                 max_age=10.0, aggregate='values', max_retries=5, backoff=0.1):
+        self.client = client or get_cloudwatch_client()
+        self.namespace = namespace
+        self.max_batch_size = min(max_batch_size, MAX_METRIC_DATA_PER_REQUEST)
+        self.max_age = max_age
+        self.aggregate = aggregate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sent_requests = 0
+        self.failed_requests = 0
+        self.dropped_points = 0
+        self._buffer = {}
+        self._pending_datums = 0
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='metric-publisher', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, metric_name, value, unit, timestamp=None, dimensions=None, storage_resolution=60):
+        """Queue one data point; never blocks on the network
+
+        Raises ValueError for NaN and infinite values, which CloudWatch would
+        reject together with every other datum in the same request.
+        """
+        if not math.isfinite(value):
+            raise ValueError(f'Metric value {value!r} is not a finite number')
+        timestamp = timestamp or datetime.now(timezone.utc)
+        bucket = int(timestamp.timestamp()) // storage_resolution * storage_resolution
+        key = (metric_name, unit, tuple(sorted((dimensions or {}).items())), storage_resolution, bucket)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('MetricPublisher is closed')
+            counts = self._buffer.get(key)
+            if counts is None:
+                counts = self._buffer[key] = {}
+                self._pending_datums += 1
+            if self.aggregate is None:
+                counts[len(counts)] = value
+                if len(counts) > 1:
+                    self._pending_datums += 1
+            else:
+                if (self.aggregate == 'values' and value not in counts
+                        and counts and len(counts) % MAX_VALUES_PER_DATUM == 0):
+                    self._pending_datums += 1
+                counts[value] = counts.get(value, 0) + 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self._pending_datums >= self.max_batch_size:
+                self._wakeup.set()
+
+    def flush(self):
+        """Send everything buffered so far"""
+        with self._lock:
+            buffer, self._buffer = self._buffer, {}
+            self._pending_datums = 0
+            self._oldest = None
+        batch, batch_bytes = [], 0
+        for datum in self._datums(buffer):
+            size = _estimate_datum_size(datum)
+            if batch and (len(batch) >= self.max_batch_size or batch_bytes + size > MAX_METRIC_REQUEST_BYTES):
+                self._send(batch)
+                batch, batch_bytes = [], 0
+            batch.append(datum)
+            batch_bytes += size
+        if batch:
+            self._send(batch)
+
+    def close(self):
+        """Flush and stop the background thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _datums(self, buffer):
+        for (metric_name, unit, dimensions, storage_resolution, bucket), counts in buffer.items():
+            base = {
+                'MetricName': metric_name,
+                'Unit': unit,
+                'Timestamp': datetime.fromtimestamp(bucket, timezone.utc),
+            }
+            if dimensions:
+                base['Dimensions'] = [{'Name': name, 'Value': value} for name, value in dimensions]
+            if storage_resolution != 60:
+                base['StorageResolution'] = storage_resolution
+            if self.aggregate is None:
+                for value in counts.values():
+                    yield dict(base, Value=value)
+            elif self.aggregate == 'statistics':
+                yield dict(base, StatisticValues={
+                    'SampleCount': sum(counts.values()),
+                    'Sum': sum(value * count for value, count in counts.items()),
+                    'Minimum': min(counts),
+                    'Maximum': max(counts),
+                })
+            elif len(counts) == 1 and next(iter(counts.values())) == 1:
+                yield dict(base, Value=next(iter(counts)))
+            else:
+                values = list(counts)
+                for start in range(0, len(values), MAX_VALUES_PER_DATUM):
+                    chunk = values[start:start + MAX_VALUES_PER_DATUM]
+                    yield dict(base, Values=chunk, Counts=[counts[value] for value in chunk])
+
+    def _send(self, metric_data):
+        """PutMetricData, retrying throttling and service-side errors with backoff"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            try:
+                self.client.put_metric_data(Namespace=self.namespace, MetricData=metric_data)
+                self.sent_requests += 1
+                return
+            except Exception as e:
+                if attempt < self.max_retries and _is_retryable(e):
+                    logger.warning('PutMetricData failed (attempt %d): %s', attempt + 1, e)
+                    continue
+                self.failed_requests += 1
+                self.dropped_points += sum(_datum_points(datum) for datum in metric_data)
+                logger.exception('PutMetricData failed; dropped %d datums', len(metric_data))
+                return
+
+    def _run(self):
+        while not self._closed:
+            timeout = None
+            oldest = self._oldest
+            if self.max_age is not None:
+                timeout = self.max_age if oldest is None else max(oldest + self.max_age - time.monotonic(), 0)
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            oldest = self._oldest
+            if self._pending_datums >= self.max_batch_size or (
+                    oldest is not None and self.max_age is not None and time.monotonic() - oldest >= self.max_age):
+                self.flush()
+
+def _datum_points(datum):
+    """Number of data points a datum built by MetricPublisher stands for"""
+    if 'StatisticValues' in datum:
+        return datum['StatisticValues']['SampleCount']
+    if 'Counts' in datum:
+        return sum(datum['Counts'])
+    return 1
+
+def _estimate_datum_size(datum):
+    """Rough upper bound of a datum's encoded size, for the request size limit"""
+    size = 200 + len(datum['MetricName']) + sum(len(d['Name']) + len(d['Value']) for d in datum.get('Dimensions', ()))
+    return size + 48 * len(datum.get('Values', ()))
+
+def put_metric_data(metric_name, value, unit, publisher=None, client=None, spool=None):
+    """Put custom metric data to CloudWatch
+
+    With a MetricPublisher the point is buffered and sent in a batch instead
+    of making one API call per data point; with a TelemetrySpool it is
+    written to disk first and replayed by the spool's drainer.
+    """
+    if publisher is not None:
+        publisher.put(metric_name, value, unit)
+        return
+    if spool is not None:
+        spool.put_metric_data(metric_name, value, unit)
+        return
+
+    (client or get_cloudwatch_client()).put_metric_data(
         Namespace='CustomMetrics',
         MetricData=[
             {
@@ -23,86 +329,1192 @@ def put_metric_data(metric_name, value, unit):
         ]
     )
 
-def put_record_to_kinesis(stream_name, data):
-    """Put a record to Kinesis Data Stream"""
+# PutRecords limits
+MAX_KINESIS_RECORDS_PER_REQUEST = 500
+MAX_KINESIS_REQUEST_BYTES = 5 * 1024 * 1024
+MAX_KINESIS_RECORD_BYTES = 1024 * 1024
+
+class KinesisPutError(Exception):
+    """A record could not be written to Kinesis after all retries"""
+
+    def __init__(self, error_code, error_message):
+        super().__init__(f"{error_code}: {error_message}")
+        self.error_code = error_code
+        self.error_message = error_message
+
+class KinesisProducer:
+    """Batch records into PutRecords calls and retry only the entries that failed
+
+    put() JSON-encodes the payload, queues it and returns a Future that
+    resolves to {'ShardId': ..., 'SequenceNumber': ...} once the record is
+    written (or to a KinesisPutError). A background thread sends up to 500
+    records / 5 MiB per request whenever that much is queued or the oldest
+    record is max_age seconds old. Entries rejected in a partially failed
+    response, and whole requests that are throttled or fail on the service
+    side, are resent with exponential backoff and jitter, up to max_retries
+    times; any other error (access denied, unknown stream, invalid request)
+    fails the batch's Futures at once.
+
+    With aggregate=True, consecutive small payloads are packed into one
+    newline-delimited JSON record of up to aggregate_bytes, sent with the
+    partition key of its first payload; all their Futures share the shard id
+    and sequence number. Consumers must split such records on newlines.
+    """
+
+    def __init__(self, stream_name, client=None, max_age=0.1, aggregate=False, aggregate_bytes=25 * 1024,
+                 max_retries=5, backoff=0.1):
+        self.stream_name = stream_name
+        self.client = client or get_kinesis_client()
+        self.max_age = max_age
+        self.aggregate = aggregate
+        self.aggregate_bytes = min(aggregate_bytes, MAX_KINESIS_RECORD_BYTES)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._queue = deque()
+        self._queued_bytes = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='kinesis-producer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, data, partition_key=None):
+        """Queue a payload; returns a Future for its shard id and sequence number"""
+        payload = json.dumps(data).encode('utf-8')
+        partition_key = partition_key or str(datetime.now(timezone.utc).timestamp())
+        future = Future()
+        if len(payload) + len(partition_key.encode('utf-8')) > MAX_KINESIS_RECORD_BYTES:
+            future.set_exception(ValueError('Record exceeds the 1 MiB Kinesis limit'))
+            return future
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('KinesisProducer is closed')
+            self._queue.append((payload, partition_key, future, time.monotonic()))
+            self._queued_bytes += len(payload) + len(partition_key)
+            if (len(self._queue) == 1 or len(self._queue) >= MAX_KINESIS_RECORDS_PER_REQUEST
+                    or self._queued_bytes >= MAX_KINESIS_REQUEST_BYTES):
+                self._wakeup.set()
+        return future
+
+    def flush(self):
+        """Send everything queued so far and wait for the outcome"""
+        while True:
+            records = self._take_batch()
+            if not records:
+                return
+            self._send(records)
+
+    def close(self):
+        """Flush and stop the background thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _take_batch(self):
+        """Pop queued payloads and pack them into at most one request's worth of records"""
+        records = []
+        request_bytes = 0
+        with self._lock:
+            while self._queue and len(records) < MAX_KINESIS_RECORDS_PER_REQUEST:
+                payload, partition_key, future, _ = self._queue[0]
+                size = len(payload) + len(partition_key)
+                if (self.aggregate and records and records[-1]['aggregated']
+                        and records[-1]['size'] + len(payload) + 1 <= self.aggregate_bytes
+                        and request_bytes + len(payload) + 1 <= MAX_KINESIS_REQUEST_BYTES):
+                    record = records[-1]
+                    record['data'] += b'\n' + payload
+                    record['size'] += len(payload) + 1
+                    record['futures'].append(future)
+                    request_bytes += len(payload) + 1
+                elif request_bytes + size <= MAX_KINESIS_REQUEST_BYTES or not records:
+                    records.append({
+                        'data': payload,
+                        'key': partition_key,
+                        'size': size,
+                        'futures': [future],
+                        'aggregated': self.aggregate and size < self.aggregate_bytes,
+                    })
+                    request_bytes += size
+                else:
+                    break
+                self._queue.popleft()
+                self._queued_bytes -= size
+        return records
+
+    def _send(self, records):
+        """PutRecords with retries of the failed entries only"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            try:
+                response = self.client.put_records(
+                    StreamName=self.stream_name,
+                    Records=[{'Data': record['data'], 'PartitionKey': record['key']} for record in records],
+                )
+            except Exception as e:
+                logger.warning('PutRecords failed (attempt %d): %s', attempt + 1, e)
+                response = getattr(e, 'response', None)
+                error_code = 'RequestFailed'
+                if isinstance(response, dict):
+                    error_code = response.get('Error', {}).get('Code') or error_code
+                failed = [(record, (error_code, str(e))) for record in records]
+                if not _is_retryable(e):
+                    break
+            else:
+                failed = []
+                for record, result in zip(records, response['Records']):
+                    if result.get('ErrorCode'):
+                        failed.append((record, (result['ErrorCode'], result.get('ErrorMessage', ''))))
+                    else:
+                        shard = {'ShardId': result['ShardId'], 'SequenceNumber': result['SequenceNumber']}
+                        for future in record['futures']:
+                            future.set_result(shard)
+            if not failed:
+                return
+            records = [record for record, _ in failed]
+        for record, (error_code, error_message) in failed:
+            for future in record['futures']:
+                future.set_exception(KinesisPutError(error_code, error_message))
+
+    def _run(self):
+        while not self._closed:
+            with self._lock:
+                oldest = self._queue[0][3] if self._queue else None
+            timeout = None if oldest is None else max(oldest + self.max_age - time.monotonic(), 0)
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            while True:
+                with self._lock:
+                    due = self._queue and (
+                        len(self._queue) >= MAX_KINESIS_RECORDS_PER_REQUEST
+                        or self._queued_bytes >= MAX_KINESIS_REQUEST_BYTES
+                        or time.monotonic() - self._queue[0][3] >= self.max_age)
+                if not due:
+                    break
+                records = self._take_batch()
+                if records:
+                    self._send(records)
 
-    response = kinesis.put_record(
+def put_record_to_kinesis(stream_name, data, producer=None, client=None, spool=None):
+    """Put a record to Kinesis Data Stream
+
+    With a KinesisProducer the record is queued and batched; the return value
+    is then a Future of the usual {'ShardId', 'SequenceNumber'} response.
+    With a TelemetrySpool the record is written to disk first and None is
+    returned.
+    """
+    if spool is not None:
+        spool.put_record(stream_name, data)
+        return None
+    if producer is not None:
+        if producer.stream_name != stream_name:
+            raise ValueError(f"Producer writes to {producer.stream_name!r}, not {stream_name!r}")
+        return producer.put(data)
+
+    response = (client or get_kinesis_client()).put_record(
         StreamName=stream_name,
         Data=json.dumps(data),
         PartitionKey=str(datetime.now(timezone.utc).timestamp())
     )
     return response
 
-def log_to_cloudwatch(log_group, log_stream, message):
-    cloudwatch_logs = boto3.client('logs')
-    cloudwatch_logs.put_log_events(
-        logGroupName=log_group,
-        logStreamName=log_stream,
-        logEvents=[
-            {
-                'timestamp': int(time.time() * 1000),
-                'message': message,
-            },
-        ]
-    )
+# PutLogEvents limits
+MAX_LOG_EVENTS_PER_REQUEST = 10000
+MAX_LOG_REQUEST_BYTES = 1048576
+LOG_EVENT_OVERHEAD_BYTES = 26
+MAX_LOG_REQUEST_SPAN_MS = 24 * 60 * 60 * 1000
 
-def optimize_production():
-    
-    """Optimize production using linear programming and log the results to CloudWatch"""
-    
-    log_group = 'ProductionOptimizationLogs'
-    log_stream = 'OptimizationResults'
+class CloudWatchLogsHandler(logging.Handler):
+    """Buffer log events per group/stream and ship them with bulk PutLogEvents calls
 
-    # Create the LP problem
-    prob = pulp.LpProblem("Production Optimization", pulp.LpMaximize)
+    append() (and emit(), when used as a logging handler) only adds the event
+    to an in-memory buffer. A background thread flushes every max_age
+    seconds, or sooner once a stream has a full request's worth of events;
+    events are sorted by timestamp and split to respect the PutLogEvents
+    count, size and 24-hour span limits. A request that is throttled or
+    fails on the service side is retried with exponential backoff and
+    jitter, up to max_retries times, before its events are dropped.
+    close() flushes what is left.
 
-    # Define variables
-    x1 = pulp.LpVariable("Product_1", lowBound=0)
-    x2 = pulp.LpVariable("Product_2", lowBound=0)
+    Used as a logging handler it needs log_group and log_stream; without
+    them every record is rejected through handleError() instead of being
+    queued for a request that cannot succeed.
+    """
 
-    # Define the objective function
-    prob += 20 * x1 + 30 * x2, "Profit"
+    def __init__(self, log_group=None, log_stream=None, client=None, max_age=1.0, level=logging.NOTSET,
+                 max_retries=5, backoff=0.1):
+        if (log_group is None) != (log_stream is None):
+            raise ValueError('Pass both log_group and log_stream, or neither')
+        super().__init__(level)
+        self.log_group = log_group
+        self.log_stream = log_stream
+        self.client = client
+        self.max_age = max_age
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.failed_requests = 0
+        self.dropped_events = 0
+        self._buffers = {}
+        self._buffer_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='cloudwatch-logs', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
 
-    # Define constraints
-    prob += 2 * x1 + 3 * x2 <= 100, "Labor_hours"
-    prob += 4 * x1 + 3 * x2 <= 120, "Material_units"
+    def append(self, log_group, log_stream, message, timestamp=None):
+        """Queue one event; timestamp is in epoch milliseconds (default: now)"""
+        if not log_group or not log_stream:
+            raise ValueError('CloudWatch Logs events need a log group and a log stream')
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        with self._buffer_lock:
+            events = self._buffers.setdefault((log_group, log_stream), [])
+            events.append({'timestamp': timestamp, 'message': message})
+            if len(events) >= MAX_LOG_EVENTS_PER_REQUEST:
+                self._wakeup.set()
 
-    # Solve the problem
-    prob.solve()
+    def emit(self, record):
+        try:
+            self.append(self.log_group, self.log_stream, self.format(record), int(record.created * 1000))
+        except Exception:
+            self.handleError(record)
 
-    # Prepare the results
-    status = pulp.LpStatus[prob.status]
-    product1 = x1.varValue
-    product2 = x2.varValue
-    total_profit = pulp.value(prob.objective)
+    def flush(self):
+        """Send everything buffered so far"""
+        with self._buffer_lock:
+            buffers, self._buffers = self._buffers, {}
+        client = self.client or get_logs_client()
+        for (log_group, log_stream), events in buffers.items():
+            events.sort(key=lambda event: event['timestamp'])
+            for batch in _log_event_batches(events):
+                self._send(client, log_group, log_stream, batch)
 
-    # Log the results to CloudWatch
-    log_to_cloudwatch(log_group, log_stream, f"Status: {status}")
-    log_to_cloudwatch(log_group, log_stream, "Optimal Production Plan:")
-    log_to_cloudwatch(log_group, log_stream, f"Product 1: {product1} units")
-    log_to_cloudwatch(log_group, log_stream, f"Product 2: {product2} units")
-    log_to_cloudwatch(log_group, log_stream, f"Total Profit: ${total_profit}")
+    def _send(self, client, log_group, log_stream, batch):
+        """PutLogEvents, retrying throttling and service-side errors with backoff"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            try:
+                client.put_log_events(logGroupName=log_group, logStreamName=log_stream, logEvents=batch)
+                return
+            except Exception as e:
+                if attempt < self.max_retries and _is_retryable(e):
+                    logger.warning('PutLogEvents to %s/%s failed (attempt %d): %s',
+                                   log_group, log_stream, attempt + 1, e)
+                    continue
+                self.failed_requests += 1
+                self.dropped_events += len(batch)
+                logger.exception('PutLogEvents to %s/%s failed; dropped %d events',
+                                 log_group, log_stream, len(batch))
+                return
 
-    # Send the results to Kinesis
-    stream_name = 'ProductionOptimizationResults'
-    data = {
-        'timestamp': str(datetime.now(timezone.utc)),  # Fixed here
-        'status': status,
-        'product1': product1,
-        'product2': product2,
-        'total_profit': total_profit
+    def close(self):
+        """Flush and stop the background thread"""
+        if not self._closed:
+            self._closed = True
+            self._wakeup.set()
+            self._thread.join()
+            self.flush()
+            atexit.unregister(self.close)
+        super().close()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.max_age)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            self.flush()
+
+def _log_event_batches(events):
+    """Split timestamp-sorted events into PutLogEvents-sized batches"""
+    batch, batch_bytes = [], 0
+    for event in events:
+        size = len(event['message'].encode('utf-8')) + LOG_EVENT_OVERHEAD_BYTES
+        if batch and (len(batch) >= MAX_LOG_EVENTS_PER_REQUEST
+                      or batch_bytes + size > MAX_LOG_REQUEST_BYTES
+                      or event['timestamp'] - batch[0]['timestamp'] > MAX_LOG_REQUEST_SPAN_MS):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(event)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+_default_log_handler = None
+_singletons_lock = threading.Lock()
+
+def get_log_handler():
+    """Process-wide CloudWatchLogsHandler used by log_to_cloudwatch()"""
+    global _default_log_handler
+    if _default_log_handler is None:
+        with _singletons_lock:
+            if _default_log_handler is None:
+                _default_log_handler = CloudWatchLogsHandler()
+    return _default_log_handler
+
+def log_to_cloudwatch(log_group, log_stream, message, spool=None):
+    """Queue a log event for CloudWatch Logs; sent in bulk by a background thread
+
+    With a TelemetrySpool the event is written to disk first instead.
+    """
+    if spool is not None:
+        spool.log(log_group, log_stream, message)
+        return
+    get_log_handler().append(log_group, log_stream, message)
+
+def _put_log_event(log_group, log_stream, message, client=None):
+    _put_log_events(log_group, log_stream, [message], client=client)
+
+def _put_log_events(log_group, log_stream, messages, client=None):
+    """Send messages, in order, in as few PutLogEvents calls as the limits allow"""
+    client = client or get_logs_client()
+    timestamp = int(time.time() * 1000)
+    events = [{'timestamp': timestamp, 'message': message} for message in messages]
+    for batch in _log_event_batches(events):
+        client.put_log_events(logGroupName=log_group, logStreamName=log_stream, logEvents=batch)
+
+# Durable spool: telemetry is appended to memory-mapped segment files and
+# replayed to AWS in bulk by a background drainer
+SPOOL_SEGMENT_BYTES = 16 * 1024 * 1024
+SPOOL_ENTRY_HEADER = struct.Struct('<II')  # payload length, CRC-32 of the payload
+
+class TelemetrySpool:
+    """Append-only on-disk spool for metrics, log events and Kinesis records
+
+    put_metric_data(), put_record() and log() append a checksummed JSON entry
+    to the current memory-mapped segment file (segment_bytes, preallocated)
+    and return immediately, so producer latency does not depend on AWS. The
+    payload is written before its header, so a torn write is never read
+    back; a zero header marks the end of a segment.
+
+    A drainer thread replays entries in bulk (PutMetricData, PutLogEvents,
+    PutRecords) every drain_interval seconds, backing off exponentially up
+    to max_backoff while AWS fails, and only then advances a cursor file
+    and deletes fully drained segments. Delivery is at least once: entries
+    sent just before a crash may be sent again after a restart. With
+    sync=True every append is also flushed to disk with msync.
+
+    Entries AWS could never accept (a record or log event over 1 MiB, a
+    metric value that is not a finite number) are refused with ValueError
+    when spooled. If AWS still rejects a request as invalid, the batch is
+    split until the entries at fault are found; those are appended to
+    dead-letter.jsonl in the spool directory, with the error, so they
+    cannot hold up the entries behind them. Any other error, including
+    throttling, is retried.
+
+    A spool directory belongs to one TelemetrySpool in one process at a
+    time: the constructor takes an exclusive flock on its lock file and
+    raises RuntimeError if another spool holds it, so give each process
+    (e.g. each worker) its own directory. Without fcntl (Windows) the
+    directory is not locked.
+    """
+
+    def __init__(self, directory, segment_bytes=SPOOL_SEGMENT_BYTES, client_factory=None, namespace='CustomMetrics',
+                 drain_interval=0.5, max_backoff=30.0, sync=False):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.client_factory = client_factory or get_client
+        self.namespace = namespace
+        self.drain_interval = drain_interval
+        self.max_backoff = max_backoff
+        self.sync = sync
+        self.drained_entries = 0
+        self.rejected_entries = 0
+        self.failed_drains = 0
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pending = []
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, 'lock'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                raise RuntimeError(f'Spool directory {directory} is in use by another TelemetrySpool') from None
+
+        segments = self._segments()
+        self._cursor = self._load_cursor() or ((segments[0] if segments else 1), 0)
+        self._open_segment(segments[-1] if segments else self._cursor[0])
+        self._reader = None
+        self._thread = threading.Thread(target=self._run, name='telemetry-spool', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put_metric_data(self, metric_name, value, unit, timestamp=None):
+        self._append({'kind': 'metric', 'namespace': self.namespace, 'name': metric_name, 'value': value,
+                      'unit': unit, 'timestamp': time.time() if timestamp is None else timestamp})
+
+    def put_record(self, stream_name, data, partition_key=None):
+        self._append({'kind': 'kinesis', 'stream': stream_name, 'data': json.dumps(data),
+                      'key': partition_key or str(datetime.now(timezone.utc).timestamp())})
+
+    def log(self, log_group, log_stream, message, timestamp=None):
+        self._append({'kind': 'log', 'group': log_group, 'stream': log_stream, 'message': message,
+                      'timestamp': int(time.time() * 1000) if timestamp is None else timestamp})
+
+    def _path(self, segment):
+        return os.path.join(self.directory, f'{segment:020d}.seg')
+
+    def _segments(self):
+        return sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith('.seg'))
+
+    def _open_segment(self, segment):
+        """Map a segment for appending, positioned after its last intact entry"""
+        with open(self._path(segment), 'a+b') as f:
+            if os.fstat(f.fileno()).st_size < self.segment_bytes:
+                f.truncate(self.segment_bytes)
+            self._map = mmap.mmap(f.fileno(), self.segment_bytes)
+        self._segment = segment
+        self._offset = 0
+        for _, self._offset in _spool_entries(self._map, 0):
+            pass
+        if self._offset + SPOOL_ENTRY_HEADER.size <= self.segment_bytes and any(
+                self._map[self._offset:self._offset + SPOOL_ENTRY_HEADER.size]):
+            # Torn write from a crash: clear it so it cannot be mistaken for an entry
+            self._map[self._offset:] = bytes(self.segment_bytes - self._offset)
+
+    def _append(self, entry):
+        error = _spool_entry_error(entry)
+        if error is not None:
+            raise ValueError(error)
+        payload = json.dumps(entry, separators=(',', ':')).encode('utf-8')
+        size = SPOOL_ENTRY_HEADER.size + len(payload)
+        if size > self.segment_bytes:
+            raise ValueError(f'Entry of {size} bytes does not fit in a {self.segment_bytes}-byte spool segment')
+        with self._lock:
+            if self._stop.is_set():
+                raise RuntimeError('TelemetrySpool is closed')
+            if self._offset + size > self.segment_bytes:
+                self._map.flush()
+                self._map.close()
+                self._open_segment(self._segment + 1)
+            start = self._offset + SPOOL_ENTRY_HEADER.size
+            self._map[start:start + len(payload)] = payload
+            self._map[self._offset:start] = SPOOL_ENTRY_HEADER.pack(len(payload), zlib.crc32(payload))
+            self._offset += size
+            if self.sync:
+                self._map.flush()
+
+    def _load_cursor(self):
+        try:
+            with open(os.path.join(self.directory, 'cursor')) as f:
+                cursor = json.load(f)
+        except FileNotFoundError:
+            return None
+        return cursor['segment'], cursor['offset']
+
+    def _save_cursor(self):
+        path = os.path.join(self.directory, 'cursor')
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'segment': self._cursor[0], 'offset': self._cursor[1]}, f)
+            if self.sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
+    def _read(self, limit=MAX_LOG_EVENTS_PER_REQUEST):
+        """Decode up to limit entries from the cursor; returns them with the cursor after them"""
+        segment, offset = self._cursor
+        entries = []
+        while len(entries) < limit:
+            # A segment is sealed once a newer one exists; check that before
+            # reading, so an entry appended meanwhile is not skipped
+            sealed = self._segment > segment
+            if self._reader is None or self._reader[0] != segment:
+                if self._reader is not None:
+                    self._reader[1].close()
+                with open(self._path(segment), 'rb') as f:
+                    self._reader = (segment, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            for payload, offset in _spool_entries(self._reader[1], offset):
+                entries.append(json.loads(payload))
+                if len(entries) >= limit:
+                    break
+            else:
+                if not sealed:
+                    break
+                segment, offset = segment + 1, 0
+        return entries, (segment, offset)
+
+    def drain(self):
+        """Send everything spooled so far; raises if AWS rejects a request (nothing is lost)"""
+        with self._drain_lock:
+            while True:
+                if not self._pending:
+                    self._pending, self._pending_cursor = self._read()
+                    if not self._pending:
+                        self._advance(self._pending_cursor)
+                        return
+                failed, rejected = self._send(self._pending)
+                if rejected:
+                    self._dead_letter(rejected)
+                self.drained_entries += len(self._pending) - len(failed) - len(rejected)
+                self._pending = failed
+                if failed:
+                    raise RuntimeError(f'{len(failed)} spooled telemetry entries were not accepted')
+                self._advance(self._pending_cursor)
+
+    def _advance(self, cursor):
+        if cursor == self._cursor:
+            return
+        self._cursor = cursor
+        self._save_cursor()
+        for segment in self._segments():
+            if segment < cursor[0]:
+                os.remove(self._path(segment))
+
+    def _dead_letter(self, rejected):
+        """Append entries AWS will never accept, with the reason, to dead-letter.jsonl"""
+        path = os.path.join(self.directory, 'dead-letter.jsonl')
+        with open(path, 'a') as f:
+            for entry, error in rejected:
+                f.write(json.dumps(dict(entry, error=error)) + '\n')
+            if self.sync:
+                f.flush()
+                os.fsync(f.fileno())
+        self.rejected_entries += len(rejected)
+        logger.warning('Moved %d spooled telemetry entries rejected by AWS to %s', len(rejected), path)
+
+    def _send(self, entries):
+        """Send entries in bulk; returns the ones to retry and the (entry, error) pairs rejected for good"""
+        failed, rejected = [], []
+        groups = {}
+        for entry in entries:
+            error = _spool_entry_error(entry)
+            if error is not None:
+                rejected.append((entry, error))
+                continue
+            if entry['kind'] == 'log':
+                key = ('log', entry['group'], entry['stream'])
+            elif entry['kind'] == 'kinesis':
+                key = ('kinesis', entry['stream'])
+            else:
+                key = ('metric', entry['namespace'])
+            groups.setdefault(key, []).append(entry)
+        for (kind, *target), group in groups.items():
+            try:
+                if kind == 'log':
+                    group_failed, group_rejected = self._send_logs(*target, group)
+                elif kind == 'kinesis':
+                    group_failed, group_rejected = self._send_records(*target, group)
+                else:
+                    group_failed, group_rejected = self._send_metrics(*target, group)
+            except Exception as e:
+                logger.warning('Replaying %d spooled %s entries failed: %s', len(group), kind, e)
+                group_failed, group_rejected = group, []
+            failed += group_failed
+            rejected += group_rejected
+        return failed, rejected
+
+    @staticmethod
+    def _send_batches(kind, batches, request):
+        """Send batches in order with request(batch), which returns the entries to retry
+
+        A batch rejected as invalid is split in halves until the entries at
+        fault are isolated; any other error stops the replay. Returns the
+        entries to retry and the (entry, error) pairs rejected for good.
+        """
+        failed, rejected = [], []
+        batches = deque(batches)
+        while batches:
+            batch = batches.popleft()
+            try:
+                failed += request(batch)
+            except Exception as e:
+                if not _is_validation_error(e):
+                    logger.warning('Replaying spooled %s entries failed: %s', kind, e)
+                    failed += batch + [entry for rest in batches for entry in rest]
+                    break
+                if len(batch) == 1:
+                    rejected.append((batch[0], str(e)))
+                else:
+                    middle = len(batch) // 2
+                    batches.extendleft((batch[middle:], batch[:middle]))
+        return failed, rejected
+
+    def _send_logs(self, log_group, log_stream, entries):
+        client = self.client_factory('logs')
+
+        def request(batch):
+            client.put_log_events(logGroupName=log_group, logStreamName=log_stream,
+                                  logEvents=[{'timestamp': entry['timestamp'], 'message': entry['message']}
+                                             for entry in batch])
+            return []
+
+        entries = sorted(entries, key=lambda entry: entry['timestamp'])
+        return self._send_batches('log', _log_event_batches(entries), request)
+
+    def _send_records(self, stream_name, entries):
+        client = self.client_factory('kinesis')
+
+        def request(batch):
+            response = client.put_records(
+                StreamName=stream_name,
+                Records=[{'Data': entry['data'], 'PartitionKey': entry['key']} for entry in batch],
+            )
+            return [entry for entry, result in zip(batch, response['Records']) if result.get('ErrorCode')]
+
+        return self._send_batches('Kinesis', _spool_record_batches(entries), request)
+
+    def _send_metrics(self, namespace, entries):
+        client = self.client_factory('cloudwatch')
+
+        def request(batch):
+            client.put_metric_data(Namespace=namespace, MetricData=[_spool_metric_datum(entry) for entry in batch])
+            return []
+
+        return self._send_batches('metric', _spool_metric_batches(entries), request)
+
+    def _run(self):
+        delay = self.drain_interval
+        while not self._stop.wait(delay):
+            try:
+                self.drain()
+                delay = self.drain_interval
+            except Exception:
+                self.failed_drains += 1
+                delay = min(max(delay * 2, self.drain_interval), self.max_backoff)
+
+    def close(self, drain=True):
+        """Stop the drainer, try a last drain and unmap; undelivered entries stay on disk"""
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self._stop.set()
+        self._thread.join()
+        if drain:
+            try:
+                self.drain()
+            except Exception:
+                logger.warning('%d spooled telemetry entries left for the next run', len(self._pending))
+        with self._lock:
+            self._map.flush()
+            self._map.close()
+        if self._reader is not None:
+            self._reader[1].close()
+        self._lock_file.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _spool_entry_error(entry):
+    """Why AWS would never accept a spool entry, or None"""
+    if entry['kind'] == 'log':
+        if len(entry['message'].encode('utf-8')) + LOG_EVENT_OVERHEAD_BYTES > MAX_LOG_REQUEST_BYTES:
+            return 'Log event exceeds the 1 MiB PutLogEvents limit'
+    elif entry['kind'] == 'kinesis':
+        if len(entry['data'].encode('utf-8')) + len(entry['key'].encode('utf-8')) > MAX_KINESIS_RECORD_BYTES:
+            return 'Record exceeds the 1 MiB Kinesis limit'
+    elif not isinstance(entry['value'], (int, float)) or not math.isfinite(entry['value']):
+        return f"Metric value {entry['value']!r} is not a finite number"
+    return None
+
+def _spool_metric_datum(entry):
+    return {
+        'MetricName': entry['name'],
+        'Value': entry['value'],
+        'Unit': entry['unit'],
+        'Timestamp': datetime.fromtimestamp(entry['timestamp'], timezone.utc),
     }
-    response = put_record_to_kinesis(stream_name, data)
-    log_to_cloudwatch(log_group, log_stream, f"Optimization results sent to Kinesis. Shard ID: {response['ShardId']}")
 
-    # Return the results
+def _spool_metric_batches(entries):
+    """Split metric entries into PutMetricData-sized batches"""
+    batch, batch_bytes = [], 0
+    for entry in entries:
+        size = _estimate_datum_size(_spool_metric_datum(entry))
+        if batch and (len(batch) >= MAX_METRIC_DATA_PER_REQUEST or batch_bytes + size > MAX_METRIC_REQUEST_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(entry)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+def _spool_record_batches(entries):
+    """Split Kinesis entries into PutRecords-sized batches"""
+    batch, batch_bytes = [], 0
+    for entry in entries:
+        size = len(entry['data'].encode('utf-8')) + len(entry['key'].encode('utf-8'))
+        if batch and (len(batch) >= MAX_KINESIS_RECORDS_PER_REQUEST or batch_bytes + size > MAX_KINESIS_REQUEST_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(entry)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+def _spool_entries(buffer, offset):
+    """Yield (payload, next offset) for the intact entries of a segment starting at offset"""
+    header_size = SPOOL_ENTRY_HEADER.size
+    while offset + header_size <= len(buffer):
+        length, checksum = SPOOL_ENTRY_HEADER.unpack_from(buffer, offset)
+        end = offset + header_size + length
+        if not length or end > len(buffer):
+            return
+        payload = buffer[offset + header_size:end]
+        if zlib.crc32(payload) != checksum:
+            return
+        offset = end
+        yield payload, offset
+
+# Async telemetry: the boto3 calls run on a dedicated thread pool so the event
+# loop (and the caller) never waits on an AWS round-trip
+_telemetry_executor = None
+_telemetry_tasks = set()
+
+def _get_telemetry_executor():
+    global _telemetry_executor
+    if _telemetry_executor is None:
+        with _singletons_lock:
+            if _telemetry_executor is None:
+                _telemetry_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='telemetry')
+    return _telemetry_executor
+
+async def _run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_telemetry_executor(), functools.partial(func, *args, **kwargs))
+
+async def put_metric_data_async(metric_name, value, unit, client=None):
+    """Async put_metric_data"""
+    await _run_blocking(put_metric_data, metric_name, value, unit, client=client)
+
+async def put_record_to_kinesis_async(stream_name, data, client=None):
+    """Async put_record_to_kinesis; returns the PutRecord response"""
+    return await _run_blocking(put_record_to_kinesis, stream_name, data, client=client)
+
+async def log_to_cloudwatch_async(log_group, log_stream, message, client=None):
+    """Async log_to_cloudwatch; completes once CloudWatch Logs has accepted the event"""
+    await _run_blocking(_put_log_event, log_group, log_stream, message, client=client)
+
+async def log_events_to_cloudwatch_async(log_group, log_stream, messages, client=None):
+    """Async log_to_cloudwatch for several messages, sent in order as one PutLogEvents batch"""
+    await _run_blocking(_put_log_events, log_group, log_stream, messages, client=client)
+
+def send_in_background(coro):
+    """Schedule a telemetry coroutine without awaiting it; see drain_telemetry()"""
+    task = asyncio.ensure_future(coro)
+    _telemetry_tasks.add(task)
+    task.add_done_callback(_telemetry_done)
+    return task
+
+def _telemetry_done(task):
+    _telemetry_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error('Background telemetry failed', exc_info=task.exception())
+
+async def drain_telemetry():
+    """Wait for all telemetry scheduled with send_in_background()"""
+    while _telemetry_tasks:
+        await asyncio.gather(*list(_telemetry_tasks), return_exceptions=True)
+
+OPTIMIZATION_LOG_GROUP = 'ProductionOptimizationLogs'
+OPTIMIZATION_LOG_STREAM = 'OptimizationResults'
+OPTIMIZATION_STREAM_NAME = 'ProductionOptimizationResults'
+
+# Problems with at most this many products (and few enough candidate bases)
+# are solved in-process by solve_small_lps() instead of by CBC
+SMALL_LP_MAX_VARIABLES = 3
+SMALL_LP_MAX_BASES = 4096
+SMALL_LP_TOLERANCE = 1e-9
+
+def small_lp_supported(n_products, n_resources):
+    """Whether solve_small_lps() handles problems of this size"""
+    return (n_products <= SMALL_LP_MAX_VARIABLES and
+            math.comb(n_resources + n_products + 1, n_products) <= SMALL_LP_MAX_BASES)
+
+def solve_small_lps(profit, usage, capacity):
+    """Solve a batch of small production LPs by vertex enumeration
+
+    Instance i is: maximize profit[i] @ x subject to usage[i] @ x <= capacity[i], x >= 0.
+    Every basis (choice of n active constraints) of every instance is solved
+    at once with batched linear algebra, and the best feasible vertex wins.
+    A feasible problem is unbounded exactly when some direction d >= 0 with
+    usage @ d <= 0 has profit @ d > 0; the best such direction is found the
+    same way, among the vertices of that cone cut by sum(d) = 1, so no
+    artificial bound is needed and the result does not depend on the scale
+    of the data.
+
+    Args:
+        profit: (k, n) or (n,)
+        usage: (k, m, n) or (m, n), shared by all instances
+        capacity: (k, m) or (m,)
+
+    Returns:
+        Dict with status (k,), as pulp.LpStatus names, quantities (k, n) and
+        total_profit (k,); both are NaN unless the status is Optimal
+    """
+    profit = np.asarray(profit, dtype=float)
+    capacity = np.asarray(capacity, dtype=float)
+    usage = np.asarray(usage, dtype=float)
+    k = max(len(profit) if profit.ndim == 2 else 1, len(capacity) if capacity.ndim == 2 else 1,
+            len(usage) if usage.ndim == 3 else 1)
+    n = profit.shape[-1]
+    m = capacity.shape[-1]
+    profit = np.broadcast_to(profit, (k, n))
+    capacity = np.broadcast_to(capacity, (k, m))
+    usage = np.broadcast_to(usage, (k, m, n))
+
+    rows = np.concatenate([usage, np.broadcast_to(-np.eye(n), (k, n, n))], axis=1)
+    limits = np.concatenate([capacity, np.zeros((k, n))], axis=1)
+    row_norms = np.linalg.norm(rows, axis=2)
+
+    bases = np.array(list(itertools.combinations(range(m + n), n)))
+    matrices = rows[:, bases]
+    determinants = np.linalg.det(matrices)
+    regular = np.abs(determinants) > SMALL_LP_TOLERANCE * row_norms[:, bases].prod(axis=2)
+    matrices = np.where(regular[..., None, None], matrices, np.eye(n))
+    vertices = np.linalg.solve(matrices, limits[:, bases][..., None])[..., 0]
+
+    slack = limits[:, None, :] - np.einsum('krn,kbn->kbr', rows, vertices)
+    feasible = regular & (slack >= -SMALL_LP_TOLERANCE * (1 + np.abs(limits[:, None, :]))).all(axis=2)
+    objective = np.where(feasible, np.einsum('kn,kbn->kb', profit, vertices), -np.inf)
+    best_objective = objective.max(axis=1)
+    infeasible = np.isneginf(best_objective)
+    margin = 1e3 * SMALL_LP_TOLERANCE * (1 + np.abs(np.where(infeasible, 0.0, best_objective)))
+    # Among optimal vertices prefer the one with the most zero quantities, as
+    # the simplex method tends to return
+    zeros = (np.abs(vertices) <= SMALL_LP_TOLERANCE).sum(axis=2)
+    best = np.where(objective >= (best_objective - margin)[:, None], zeros, -1).argmax(axis=1)
+
+    # Recession directions d >= 0 with usage @ d <= 0, scaled to sum(d) = 1,
+    # form a polytope whose vertices have n - 1 of those constraints active
+    ray_bases = list(itertools.combinations(range(m + n), n - 1))
+    ray_bases = np.array(ray_bases, dtype=int).reshape(len(ray_bases), n - 1)
+    ray_matrices = np.concatenate([rows[:, ray_bases], np.ones((k, len(ray_bases), 1, n))], axis=2)
+    ray_norms = np.concatenate([row_norms[:, ray_bases], np.full((k, len(ray_bases), 1), math.sqrt(n))], axis=2)
+    ray_regular = np.abs(np.linalg.det(ray_matrices)) > SMALL_LP_TOLERANCE * ray_norms.prod(axis=2)
+    ray_matrices = np.where(ray_regular[..., None, None], ray_matrices, np.eye(n))
+    ray_limits = np.zeros((k, len(ray_bases), n, 1))
+    ray_limits[..., -1, 0] = 1.0
+    rays = np.linalg.solve(ray_matrices, ray_limits)[..., 0]
+    ray_feasible = ray_regular & (
+        np.einsum('krn,kbn->kbr', rows, rays) <= SMALL_LP_TOLERANCE * row_norms[:, None, :]).all(axis=2)
+    ray_profit = np.where(ray_feasible, np.einsum('kn,kbn->kb', profit, rays), -np.inf).max(axis=1)
+
+    unbounded = ~infeasible & (ray_profit > 1e3 * SMALL_LP_TOLERANCE * np.abs(profit).max(axis=1))
+    optimal = ~infeasible & ~unbounded
+    status = np.full(k, 'Optimal', dtype='U10')
+    status[infeasible] = 'Infeasible'
+    status[unbounded] = 'Unbounded'
+    quantities = np.maximum(vertices[np.arange(k), best], 0.0)
+    quantities[~optimal] = np.nan
     return {
         'status': status,
+        'quantities': quantities,
+        'total_profit': np.where(optimal, np.einsum('kn,kn->k', profit, np.nan_to_num(quantities)), np.nan),
+    }
+
+class ProductionModel:
+    """Production-planning LP: maximize profit @ x subject to usage @ x <= capacity, x >= 0
+
+    The pulp model is built once, in bulk (one affine expression per row from
+    the non-zero coefficients, rather than term by term), and kept between
+    solves. update_profit() and update_capacity() change coefficients in
+    place, and solve() passes the previous solution to CBC as a warm start.
+    With fast_path, problems small enough for solve_small_lps() skip CBC.
+
+    Args:
+        products: Product names (n)
+        profit: Profit per unit of each product (n)
+        resources: Resource names (m)
+        usage: Units of each resource used per unit of each product (m x n)
+        capacity: Available units of each resource (m)
+    """
+
+    def __init__(self, products, profit, resources, usage, capacity, name='Production Optimization', solver=None,
+                 fast_path=True):
+        self.products = list(products)
+        self.resources = list(resources)
+        # Copies, so update_capacity() never writes into the caller's arrays
+        self.profit = np.array(profit, dtype=float)
+        self.usage = np.array(usage, dtype=float).reshape(len(self.resources), len(self.products))
+        self.capacity = np.array(capacity, dtype=float)
+        if self.profit.shape != (len(self.products),) or self.capacity.shape != (len(self.resources),):
+            raise ValueError('profit must have one entry per product and capacity one per resource')
+        self.solver = solver or pulp.PULP_CBC_CMD(msg=False, warmStart=True)
+        self.fast_path = fast_path and small_lp_supported(len(self.products), len(self.resources))
+        self._lock = threading.Lock()
+
+        self.problem = pulp.LpProblem(name, pulp.LpMaximize)
+        self.variables = [pulp.LpVariable(product, lowBound=0) for product in self.products]
+        self.problem.setObjective(self._expression(self.profit))
+        self.constraints = [
+            pulp.LpConstraint(self._expression(row), pulp.LpConstraintLE, resource, limit)
+            for resource, row, limit in zip(self.resources, self.usage, self.capacity)
+        ]
+        self.problem.extend(zip(self.resources, self.constraints))
+
+    @classmethod
+    def from_table(cls, table, capacity, product_column='product', profit_column='profit', **kwargs):
+        """Build a model from a DataFrame-like table with one row per product
+
+        Any mapping of column name to sequence works, including a pandas
+        DataFrame. capacity maps resource names to available units; each
+        resource must also be a column holding its usage per unit.
+        """
+        resources = list(capacity)
+        usage = np.array([np.asarray(table[resource], dtype=float) for resource in resources])
+        return cls(list(table[product_column]), np.asarray(table[profit_column], dtype=float),
+                   resources, usage, [capacity[resource] for resource in resources], **kwargs)
+
+    def _expression(self, coefficients):
+        return pulp.LpAffineExpression(
+            [(self.variables[i], float(coefficients[i])) for i in np.flatnonzero(coefficients)])
+
+    def update_profit(self, profit):
+        """Replace the profit per unit; only the objective is rebuilt"""
+        profit = np.array(profit, dtype=float)
+        with self._lock:
+            changed = profit != self.profit
+            if changed.any():
+                self.profit = profit
+                self.problem.setObjective(self._expression(profit))
+
+    def update_capacity(self, capacity):
+        """Replace capacities, given as an array (m) or a {resource: units} mapping of changes"""
+        with self._lock:
+            if hasattr(capacity, 'items'):
+                updates = {self.resources.index(resource): limit for resource, limit in capacity.items()}
+            else:
+                updates = dict(enumerate(np.asarray(capacity, dtype=float)))
+            for i, limit in updates.items():
+                if limit != self.capacity[i]:
+                    self.capacity[i] = limit
+                    self.constraints[i].changeRHS(float(limit))
+
+    def solve(self):
+        """Solve the model; returns status, total_profit and the quantities array (n)
+
+        Quantities and total_profit are NaN unless the status is Optimal,
+        whichever solver ran.
+        """
+        with self._lock:
+            if self.fast_path:
+                result = solve_small_lps(self.profit, self.usage, self.capacity)
+                return {
+                    'status': str(result['status'][0]),
+                    'quantities': result['quantities'][0],
+                    'total_profit': float(result['total_profit'][0]),
+                }
+            self.problem.solve(self.solver)
+            status = pulp.LpStatus[self.problem.status]
+            if status != 'Optimal':
+                return {'status': status, 'quantities': np.full(len(self.variables), np.nan), 'total_profit': np.nan}
+            # A product that appears in no constraint and earns nothing is left unset by CBC
+            quantities = np.array([v.varValue if v.varValue is not None else 0.0 for v in self.variables])
+            return {
+                'status': status,
+                'quantities': quantities,
+                'total_profit': float(self.profit @ quantities),
+            }
+
+# The production problem solved by optimize_production()
+PRODUCTION_PRODUCTS = ['Product_1', 'Product_2']
+PRODUCTION_PROFIT = [20, 30]
+PRODUCTION_RESOURCES = ['Labor_hours', 'Material_units']
+PRODUCTION_USAGE = [[2, 3], [4, 3]]
+PRODUCTION_CAPACITY = [100, 120]
+
+def new_production_model(**kwargs):
+    """A fresh ProductionModel for the optimize_production() problem"""
+    return ProductionModel(PRODUCTION_PRODUCTS, PRODUCTION_PROFIT,
+                           PRODUCTION_RESOURCES, PRODUCTION_USAGE, PRODUCTION_CAPACITY, **kwargs)
+
+_production_model = None
+
+def get_production_model():
+    """The model behind optimize_production(), built on first use"""
+    global _production_model
+    if _production_model is None:
+        with _singletons_lock:
+            if _production_model is None:
+                _production_model = new_production_model()
+    return _production_model
+
+def solve_production():
+    """Solve the production LP without sending any telemetry"""
+    result = get_production_model().solve()
+    product1, product2 = result['quantities'].tolist()
+    return {
+        'status': result['status'],
         'product1': product1,
         'product2': product2,
-        'total_profit': total_profit
+        'total_profit': result['total_profit']
     }
 
+# Scenario sweeps: each scenario overrides the capacities and profits of the
+# optimize_production() problem
+SCENARIO_COLUMNS = ('labor_hours', 'material_units', 'profit_1', 'profit_2')
+SCENARIO_CACHE_SIZE = 100000
+_scenario_cache = {}
+_scenario_cache_lock = threading.Lock()
+_worker_model = None
+
+def _solve_scenarios(rows):
+    """Solve scenario rows (labor_hours, material_units, profit_1, profit_2) with CBC in this process"""
+    global _worker_model
+    if _worker_model is None:
+        _worker_model = new_production_model(fast_path=False)
+    results = []
+    for labor_hours, material_units, profit_1, profit_2 in rows:
+        _worker_model.update_capacity([labor_hours, material_units])
+        _worker_model.update_profit([profit_1, profit_2])
+        result = _worker_model.solve()
+        product1, product2 = result['quantities'].tolist()
+        results.append((result['status'], product1, product2, result['total_profit']))
+    return results
+
+def sweep_production(scenarios, workers=None, chunk_size=None, fast_path=True):
+    """Solve the production LP for many what-if scenarios
+
+    Args:
+        scenarios: Mapping (or DataFrame-like table) of SCENARIO_COLUMNS to
+            equal-length sequences; missing columns keep their
+            optimize_production() values
+        workers: Worker processes for CBC; 0 or 1 solves in this process
+            (default: CPU count). Workers are started with the spawn method,
+            so they do not inherit this process's telemetry threads; as with
+            any spawned pool, the calling script needs a __main__ guard.
+        chunk_size: Scenarios per task sent to a CBC worker
+        fast_path: Solve all scenarios at once, in this process, with
+            solve_small_lps() instead of with CBC; workers and chunk_size
+            then do not apply and must be left as None
+
+    Returns:
+        Dict of equal-length arrays: the scenario columns plus status,
+        product1, product2 and total_profit. Exact duplicate scenarios,
+        within the sweep or seen by an earlier sweep, are solved only once.
+
+    Raises:
+        ValueError: If the columns differ in length, or workers or
+            chunk_size is given together with fast_path
+    """
+    if fast_path and (workers is not None or chunk_size is not None):
+        raise ValueError('workers and chunk_size only apply to the CBC path; pass fast_path=False')
+    defaults = dict(zip(SCENARIO_COLUMNS, PRODUCTION_CAPACITY + PRODUCTION_PROFIT))
+    lengths = {len(scenarios[column]) for column in SCENARIO_COLUMNS if column in scenarios}
+    if len(lengths) > 1:
+        raise ValueError('All scenario columns must have the same length')
+    n = lengths.pop() if lengths else 0
+    table = np.empty((n, len(SCENARIO_COLUMNS)))
+    for i, column in enumerate(SCENARIO_COLUMNS):
+        table[:, i] = np.asarray(scenarios[column], dtype=float) if column in scenarios else defaults[column]
+
+    unique, inverse = np.unique(table, axis=0, return_inverse=True)
+    # The solvers can differ in the last digits, so each caches its own results
+    keys = [(fast_path, *row) for row in unique.tolist()]
+    with _scenario_cache_lock:
+        solved = [_scenario_cache.get(key) for key in keys]
+    todo = [i for i, result in enumerate(solved) if result is None]
+
+    if todo:
+        rows = [keys[i][1:] for i in todo]
+        workers = os.cpu_count() if workers is None else workers
+        if fast_path:
+            solution = solve_small_lps(np.array(rows)[:, 2:], PRODUCTION_USAGE, np.array(rows)[:, :2])
+            fresh = [(status, product1, product2, total_profit) for status, (product1, product2), total_profit
+                     in zip(solution['status'].tolist(), solution['quantities'].tolist(),
+                            solution['total_profit'].tolist())]
+        elif workers <= 1 or len(rows) == 1:
+            fresh = _solve_scenarios(rows)
+        else:
+            chunk_size = chunk_size or max(1, -(-len(rows) // (workers * 4)))
+            chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+            # Forking could copy a lock held by a publisher, log handler or spool thread
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                fresh = [result for chunk in executor.map(_solve_scenarios, chunks) for result in chunk]
+        with _scenario_cache_lock:
+            for i, result in zip(todo, fresh):
+                solved[i] = result
+                _scenario_cache[keys[i]] = result
+            while len(_scenario_cache) > SCENARIO_CACHE_SIZE:
+                del _scenario_cache[next(iter(_scenario_cache))]
+
+    status, product1, product2, total_profit = zip(*solved) if solved else ((), (), (), ())
+    results = {column: table[:, i] for i, column in enumerate(SCENARIO_COLUMNS)}
+    results['status'] = np.array(status, dtype='U10')[inverse] if n else np.array([], dtype='U10')
+    for name, values in (('product1', product1), ('product2', product2), ('total_profit', total_profit)):
+        results[name] = np.array(values, dtype=float)[inverse] if n else np.array([])
+    return results
+
+def _optimization_log_messages(results):
+    return [
+        f"Status: {results['status']}",
+        "Optimal Production Plan:",
+        f"Product 1: {results['product1']} units",
+        f"Product 2: {results['product2']} units",
+        f"Total Profit: ${results['total_profit']}",
+    ]
+
+def _optimization_record(results):
+    return dict({'timestamp': str(datetime.now(timezone.utc))}, **results)
+
+def optimize_production():
+    
+    """Optimize production using linear programming and log the results to CloudWatch"""
+    
+    log_group = OPTIMIZATION_LOG_GROUP
+    log_stream = OPTIMIZATION_LOG_STREAM
+
+    results = solve_production()
+
+    # Log the results to CloudWatch
+    for message in _optimization_log_messages(results):
+        log_to_cloudwatch(log_group, log_stream, message)
+
+    # Send the results to Kinesis
+    response = put_record_to_kinesis(OPTIMIZATION_STREAM_NAME, _optimization_record(results))
+    log_to_cloudwatch(log_group, log_stream, f"Optimization results sent to Kinesis. Shard ID: {response['ShardId']}")
+
+    # Return the results
+    return results
+
+async def _send_optimization_telemetry_async(results, logs_client=None, kinesis_client=None):
+    # Like optimize_production(): one ordered batch of log lines, which are
+    # still sent if the Kinesis record fails
+    messages = _optimization_log_messages(results)
+    try:
+        response = await put_record_to_kinesis_async(OPTIMIZATION_STREAM_NAME, _optimization_record(results),
+                                                     client=kinesis_client)
+        messages.append(f"Optimization results sent to Kinesis. Shard ID: {response['ShardId']}")
+    finally:
+        await log_events_to_cloudwatch_async(OPTIMIZATION_LOG_GROUP, OPTIMIZATION_LOG_STREAM, messages,
+                                             client=logs_client)
+
+async def optimize_production_async(logs_client=None, kinesis_client=None):
+    """Async optimize_production: returns as soon as the LP is solved
+
+    The Kinesis record and then the CloudWatch Logs events, as one ordered
+    PutLogEvents batch, are sent in the background; await drain_telemetry()
+    to wait for them.
+    """
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, solve_production)
+    send_in_background(_send_optimization_telemetry_async(results, logs_client, kinesis_client))
+    return results
+
 if __name__ == "__main__":
     # Put a custom metric to CloudWatch
     put_metric_data('MyCustomMetric', 42, 'Count')
@@ -0,0 +1,229 @@
+"""
+Differential testing and benchmark harness for the payroll implementations.
+
+Generates random employee batches (optionally salted with edge cases such as
+NaN, infinities and out-of-range values), runs them through two payroll
+implementations, and reports every batch where the results or the raised
+exceptions differ. It also measures records/sec and p50/p99 batch latency for
+both sides, and profiles how a process_payroll_cobol() call splits its time
+between compiling, spawning, I/O and parsing.
+
+Usage:
+    python bench_payroll.py --a python --b cobol --batches 200 --batch-size 10
+    python bench_payroll.py --a columnar --b pool --batch-size 10000 --json results.json
+"""
+import argparse
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import script
+from script import EmployeeBatch, EmployeeRecord
+
+# Values that sit on or just past the edges of the PIC clauses
+EDGE_HOURS = [0, 0.5, -0.5, 999, 999.9, 1000, -1, float("nan"), float("inf")]
+EDGE_AMOUNTS = [0.0, 0.004, 0.005, 0.015, 99999.99, 99999.994, 99999.995, 100000.0, -0.01,
+                float("nan"), float("inf"), float("-inf")]
+
+def generate_records(count: int, rng: random.Random, edge_rate: float = 0.0) -> List[EmployeeRecord]:
+    """
+    Generates random employee records.
+
+    Args:
+        count: Number of records
+        rng: Random source (seed it for reproducible runs)
+        edge_rate: Probability that each numeric field is drawn from the edge cases
+    """
+    def amount():
+        if rng.random() < edge_rate:
+            return rng.choice(EDGE_AMOUNTS)
+        return round(rng.uniform(0, 99999.99), 2)
+
+    def hours():
+        if rng.random() < edge_rate:
+            return rng.choice(EDGE_HOURS)
+        return rng.randint(0, 999)
+
+    records = []
+    for _ in range(count):
+        emp_id = "".join(rng.choices(string.ascii_uppercase + string.digits, k=rng.randint(1, 7)))
+        records.append(EmployeeRecord(emp_id, hours(), amount(), amount()))
+    return records
+
+def _columnar(records):
+    batch = EmployeeBatch.from_records(records)
+    return script.process_payroll_columnar(batch.hours_worked, batch.hourly_rate, batch.tax_deduction)
+
+def build_implementations(pool: Optional[script.PayrollWorkerPool]) -> Dict[str, Callable]:
+    """Maps implementation names accepted by --a/--b to callables."""
+    return {
+        "python": script.process_payroll,
+        "cobol": script.process_payroll_cobol,
+        "columnar": _columnar,
+        "stream": lambda records: list(script.iter_payroll_cobol(records)),
+        "pool": lambda records: script.process_payroll_cobol(records, pool=pool),
+        "parallel": lambda records: script.process_payroll_parallel(records, pool=pool),
+    }
+
+def run_quietly(implementation: Callable, records) -> Tuple[Optional[list], Optional[Tuple[str, str]], float]:
+    """
+    Runs one implementation, capturing any exception instead of raising it.
+
+    Returns:
+        (results or None, (exception type, message) or None, elapsed seconds)
+    """
+    start = time.perf_counter()
+    try:
+        results = implementation(records)
+        error = None
+    except Exception as e:
+        results, error = None, (type(e).__name__, str(e))
+    return results, error, time.perf_counter() - start
+
+def describe_mismatch(records, results_a, error_a, results_b, error_b) -> str:
+    if error_a or error_b:
+        return f"exceptions differ: a={error_a} b={error_b}"
+    if len(results_a) != len(results_b):
+        return f"result counts differ: a={len(results_a)} b={len(results_b)}"
+    for i, (a, b) in enumerate(zip(results_a, results_b)):
+        if a != b:
+            return f"record {i} {records[i]}: a={a} b={b}"
+    return "results differ"
+
+def latency_summary(latencies: List[float], records_per_batch: int) -> Dict[str, float]:
+    total = sum(latencies)
+    return {
+        "batches": len(latencies),
+        "records_per_sec": records_per_batch * len(latencies) / total if total else float("inf"),
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+    }
+
+def profile_cobol_phases(records: List[EmployeeRecord], repeat: int = 5) -> Dict[str, float]:
+    """
+    Breaks one process_payroll_cobol() call down into its phases.
+
+    Runs each step of the bridge separately and returns the median time in
+    milliseconds of: a cold compile into an empty cache, a warm (cached)
+    compile lookup, spawning payroll on an empty file, encoding and writing
+    the input, executing the batch (minus the spawn cost) and parsing output.
+    """
+    phases = {name: [] for name in ("compile_cold", "compile_warm", "spawn", "io", "exec", "parse")}
+    batch = EmployeeBatch.from_records(records)
+    with tempfile.TemporaryDirectory() as workdir:
+        cache_dir, memo = script.COBOL_CACHE_DIR, dict(script._compiled_binaries)
+        script.COBOL_CACHE_DIR = os.path.join(workdir, "cache")
+        script._compiled_binaries.clear()
+        try:
+            start = time.perf_counter()
+            binary = script.install_cobc_and_compile_script()
+            phases["compile_cold"].append(time.perf_counter() - start)
+        finally:
+            script.COBOL_CACHE_DIR = cache_dir
+            script._compiled_binaries.clear()
+            script._compiled_binaries.update(memo)
+        binary = script.install_cobc_and_compile_script()
+
+        empty_path = os.path.join(workdir, "empty.txt")
+        open(empty_path, "wb").close()
+        input_path = os.path.join(workdir, "input.txt")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            script.install_cobc_and_compile_script()
+            phases["compile_warm"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            subprocess.run([binary, empty_path], capture_output=True, check=True)
+            spawn = time.perf_counter() - start
+            phases["spawn"].append(spawn)
+
+            start = time.perf_counter()
+            with open(input_path, "wb") as f:
+                f.write(batch.to_fixed_width())
+            phases["io"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            output = subprocess.run([binary, input_path], capture_output=True, text=True, check=True).stdout
+            phases["exec"].append(max(time.perf_counter() - start - spawn, 0.0))
+
+            start = time.perf_counter()
+            [script.parse_payroll_output_line(line) for line in output.splitlines()[1:]]
+            phases["parse"].append(time.perf_counter() - start)
+    return {name: float(np.median(times)) * 1000 for name, times in phases.items()}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--a", default="python", help="reference implementation (default: python)")
+    parser.add_argument("--b", default="cobol", help="implementation under test (default: cobol)")
+    parser.add_argument("--batches", type=int, default=100, help="number of batches")
+    parser.add_argument("--batch-size", type=int, default=10, help="records per batch")
+    parser.add_argument("--edge-rate", type=float, default=0.05,
+                        help="probability of drawing a numeric field from the edge cases")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="size of the worker pool for pool/parallel")
+    parser.add_argument("--no-profile", action="store_true", help="skip the COBOL phase breakdown")
+    parser.add_argument("--max-report", type=int, default=10, help="mismatches to print")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    pool = None
+    if {"pool", "parallel"} & {args.a, args.b}:
+        pool = script.PayrollWorkerPool(size=args.workers)
+    try:
+        implementations = build_implementations(pool)
+        for name in (args.a, args.b):
+            if name not in implementations:
+                parser.error(f"unknown implementation {name!r}; choose from {', '.join(implementations)}")
+
+        rng = random.Random(args.seed)
+        latencies = {args.a: [], args.b: []}
+        mismatches = []
+        for batch_index in range(args.batches):
+            records = generate_records(args.batch_size, rng, args.edge_rate)
+            results_a, error_a, elapsed_a = run_quietly(implementations[args.a], records)
+            results_b, error_b, elapsed_b = run_quietly(implementations[args.b], records)
+            latencies[args.a].append(elapsed_a)
+            latencies[args.b].append(elapsed_b)
+            if results_a != results_b or error_a != error_b:
+                mismatches.append({
+                    "batch": batch_index,
+                    "detail": describe_mismatch(records, results_a, error_a, results_b, error_b),
+                })
+    finally:
+        if pool is not None:
+            pool.close()
+
+    report = {
+        "config": vars(args),
+        "mismatches": len(mismatches),
+        "mismatch_examples": mismatches[:args.max_report],
+        "throughput": {name: latency_summary(times, args.batch_size) for name, times in latencies.items()},
+    }
+    if not args.no_profile:
+        report["cobol_phases_ms"] = profile_cobol_phases(generate_records(args.batch_size, random.Random(args.seed)))
+
+    print(f"{args.a} vs {args.b}: {len(mismatches)}/{args.batches} batches differ")
+    for mismatch in report["mismatch_examples"]:
+        print(f"  batch {mismatch['batch']}: {mismatch['detail']}")
+    for name, summary in report["throughput"].items():
+        print(f"{name:>10}: {summary['records_per_sec']:12.0f} records/s  "
+              f"p50 {summary['p50_ms']:8.3f} ms  p99 {summary['p99_ms']:8.3f} ms")
+    if "cobol_phases_ms" in report:
+        print("process_payroll_cobol phases (median ms): " +
+              ", ".join(f"{name} {value:.3f}" for name, value in report["cobol_phases_ms"].items()))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# X(n), 9(n), 9(n)V99 and 9(n)V9(m)
+_PIC_PATTERN = re.compile(r"^(X|9)\((\d+)\)(?:V(9+|9\((\d+)\)))?$")
+
+@dataclass(frozen=True)
+class PicField:
+    """
+    One elementary item of a copybook record.
+
+    Attributes:
+        name: Field name (used as the column key when encoding and decoding)
+        kind: "X" for alphanumeric, "9" for unsigned display numeric
+        digits: Characters for PIC X(n), integer digits for PIC 9(n)
+        scale: Implied decimal places after V (0 for integer fields)
+    """
+    name: str
+    kind: str
+    digits: int
+    scale: int = 0
+
+    @classmethod
+    def parse(cls, name: str, pic: str) -> "PicField":
+        """
+        Parses a PIC clause such as "X(5)", "9(3)" or "9(5)V99".
+
+        Raises:
+            ValueError: If the clause is not one of the supported forms
+        """
+        match = _PIC_PATTERN.match(pic.replace(" ", "").upper())
+        if match is None:
+            raise ValueError(f"Unsupported PIC clause for {name}: {pic!r}")
+        kind, digits, decimals, decimal_count = match.groups()
+        if kind == "X" and decimals:
+            raise ValueError(f"PIC X cannot have implied decimals: {pic!r}")
+        scale = int(decimal_count) if decimal_count else len(decimals or "")
+        return cls(name, kind, int(digits), scale)
+
+    @property
+    def width(self) -> int:
+        return self.digits + self.scale
+
+    @property
+    def pic(self) -> str:
+        if self.scale:
+            return f"{self.kind}({self.digits})V{'9' * self.scale}"
+        return f"{self.kind}({self.digits})"
+
+    @property
+    def max_text(self) -> str:
+        if self.scale:
+            return "9" * self.digits + "." + "9" * self.scale
+        return "9" * self.digits
+
+    @property
+    def max_value(self) -> float:
+        return float(self.max_text)
+
+    def format(self, value) -> str:
+        """
+        Formats a single value; the scalar counterpart of Copybook.encode().
+
+        Numbers are validated like format_pic_9_5_v_99: NaN, infinities and
+        values outside 0..max_value raise ValueError. Integer fields truncate
+        towards zero, scaled fields round half to even. Text is cut to the
+        field width and must then be ASCII, or ValueError is raised.
+        """
+        if self.kind == "X":
+            text = self.truncate(value)
+            if not text.isascii():
+                raise ValueError(f"PIC {self.pic} value must be ASCII: {text!r}")
+            return text.ljust(self.width)
+
+        if math.isnan(value):
+            raise ValueError("Input cannot be NaN")
+        if math.isinf(value):
+            raise ValueError("Input cannot be infinite")
+        if self.scale:
+            if value < 0 or value > self.max_value:
+                raise self._range_error()
+            scaled = int(round(value * 10 ** self.scale))
+        else:
+            scaled = int(value)
+            if scaled < 0 or scaled >= 10 ** self.digits:
+                raise self._range_error()
+        return f"{scaled:0{self.width}d}"
+
+    def truncate(self, value) -> str:
+        """Text of an X field value cut to the field width (bytes are read as Latin-1)."""
+        text = value.decode("latin-1") if isinstance(value, bytes) else str(value)
+        return text[:self.width]
+
+    def to_scaled(self, values) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized conversion of a numeric column to scaled int64.
+
+        Returns:
+            (scaled values, validity mask); invalid rows are scaled as 0
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if self.scale:
+            valid = np.isfinite(values) & (values >= 0) & (values <= self.max_value)
+            # np.rint rounds half to even on the same float64 product as round()
+            scaled = np.rint(np.where(valid, values, 0.0) * 10 ** self.scale)
+        else:
+            truncated = np.trunc(values)
+            valid = np.isfinite(truncated) & (truncated >= 0) & (truncated < 10 ** self.digits)
+            scaled = np.where(valid, truncated, 0.0)
+        return scaled.astype(np.int64), valid
+
+    def _range_error(self) -> ValueError:
+        return ValueError(f"Number out of range for PIC {self.pic} format (0 to {self.max_text})")
+
+class Copybook:
+    """
+    Encoder/decoder for newline-separated fixed-width records described by PIC clauses.
+
+    Whole batches are converted with array arithmetic into (or out of) a
+    single buffer, so cost is dominated by memory bandwidth rather than
+    per-field Python calls.
+
+    Example:
+        layout = Copybook.from_pic([("emp_id", "X(5)"), ("hours", "9(3)"), ("rate", "9(5)V99")])
+        data = layout.encode({"emp_id": ["12345"], "hours": [40], "rate": [20.0]})
+        columns = layout.decode(data)
+    """
+
+    def __init__(self, fields: Sequence[PicField]):
+        self.fields: List[PicField] = list(fields)
+        self.offsets: List[int] = []
+        offset = 0
+        for field in self.fields:
+            self.offsets.append(offset)
+            offset += field.width
+        self.record_width = offset
+        self.line_width = offset + 1
+
+    @classmethod
+    def from_pic(cls, layout: Sequence[Tuple[str, str]]) -> "Copybook":
+        """Builds a copybook from (name, PIC clause) pairs, in record order."""
+        return cls([PicField.parse(name, pic) for name, pic in layout])
+
+    def __getitem__(self, name: str) -> PicField:
+        for field in self.fields:
+            if field.name == name:
+                return field
+        raise KeyError(name)
+
+    def format_record(self, values: Sequence) -> str:
+        """Formats one record (values in field order) as a line without newline."""
+        return "".join(field.format(value) for field, value in zip(self.fields, values))
+
+    def scale(self, columns: Mapping[str, object]) -> Dict[str, np.ndarray]:
+        """
+        Validates and converts columns: numeric fields to scaled int64, X fields to bytes.
+
+        Fields missing from `columns` are skipped.
+
+        Raises:
+            ValueError: For the first invalid record in row order (and, within
+                it, the first invalid field), with the same message
+                PicField.format() gives for that value
+        """
+        scaled = {}
+        invalid = None
+        for field in self.fields:
+            if field.name not in columns:
+                continue
+            if field.kind == "X":
+                try:
+                    column = np.asarray(columns[field.name], dtype=f"S{field.width}")
+                    high = np.frombuffer(column.tobytes(), dtype=np.uint8) >= 0x80
+                    if not high.any():
+                        scaled[field.name] = column
+                        continue
+                    # Non-ASCII bytes
+                    valid = ~high.reshape(column.size, field.width).any(axis=1).reshape(column.shape)
+                    scaled[field.name] = np.where(valid, column, b"")
+                except UnicodeEncodeError:
+                    # Slow path: as in PicField.format(), only the characters
+                    # within the field width have to be ASCII
+                    texts = [field.truncate(value) for value in columns[field.name]]
+                    valid = np.array([text.isascii() for text in texts], dtype=bool)
+                    scaled[field.name] = np.array([text if text.isascii() else "" for text in texts],
+                                                  dtype=f"S{field.width}")
+            else:
+                scaled[field.name], valid = field.to_scaled(columns[field.name])
+            invalid = ~valid if invalid is None else invalid | ~valid
+        if invalid is not None and invalid.any():
+            row = int(np.argmax(invalid))
+            for field in self.fields:
+                if field.name not in columns:
+                    continue
+                if field.kind == "X":
+                    field.format(columns[field.name][row])
+                else:
+                    field.format(float(np.asarray(columns[field.name], dtype=np.float64)[row]))
+        return scaled
+
+    def encode(self, columns: Mapping[str, object]) -> bytearray:
+        """
+        Encodes equal-length columns into one newline-terminated fixed-width buffer.
+
+        Args:
+            columns: Mapping of field name to array-like
+
+        Returns:
+            bytearray of len(records) * line_width bytes
+        """
+        missing = [field.name for field in self.fields if field.name not in columns]
+        if missing:
+            raise KeyError(f"Missing columns: {', '.join(missing)}")
+        scaled = self.scale(columns)
+        n = len(next(iter(scaled.values()))) if scaled else 0
+        out = bytearray(n * self.line_width)
+        rows = np.frombuffer(out, dtype=np.uint8).reshape(n, self.line_width)
+        for field, offset in zip(self.fields, self.offsets):
+            column = scaled[field.name]
+            if len(column) != n:
+                raise ValueError("All columns must have the same length")
+            if field.kind == "X":
+                chars = np.frombuffer(column.tobytes(), dtype=np.uint8).reshape(n, field.width)
+                # S dtype pads with NUL; COBOL expects space padding
+                rows[:, offset:offset + field.width] = np.where(chars == 0, ord(" "), chars)
+            else:
+                # Peel off digits into a contiguous (width, n) scratch array using
+                # the narrowest unsigned type that holds the field, then store
+                # them all at once; much faster than strided per-digit writes
+                dtype = np.uint32 if 10 ** field.width <= 2 ** 32 else np.uint64
+                remaining = column.astype(dtype)
+                ten = dtype(10)
+                digits = np.empty((field.width, n), dtype=np.uint8)
+                for position in range(field.width - 1, -1, -1):
+                    quotient = remaining // ten
+                    digits[position] = remaining - quotient * ten
+                    remaining = quotient
+                rows[:, offset:offset + field.width] = digits.T + ord("0")
+        rows[:, self.record_width] = ord("\n")
+        return out
+
+    def decode(self, data) -> Dict[str, np.ndarray]:
+        """
+        Decodes a newline-terminated fixed-width buffer into columns.
+
+        X fields become byte-string arrays with trailing spaces removed,
+        integer fields int64 arrays and scaled fields float64 arrays.
+
+        Raises:
+            ValueError: If a line has the wrong width or a numeric field is not all digits
+        """
+        data = memoryview(data).cast("B")
+        if len(data) and data[-1] != ord("\n"):
+            data = memoryview(bytes(data) + b"\n")
+        if len(data) % self.line_width:
+            raise ValueError(f"Fixed-width input must consist of {self.record_width}-byte lines")
+        rows = np.frombuffer(data, dtype=np.uint8).reshape(-1, self.line_width)
+        if (rows[:, self.record_width] != ord("\n")).any():
+            raise ValueError(f"Fixed-width input must consist of {self.record_width}-byte lines")
+
+        columns = {}
+        for field, offset in zip(self.fields, self.offsets):
+            raw = rows[:, offset:offset + field.width]
+            if field.kind == "X":
+                values = np.ascontiguousarray(raw).view(f"S{field.width}").ravel()
+                columns[field.name] = np.char.rstrip(values, b" ")
+                continue
+            digits = raw.astype(np.int64) - ord("0")
+            bad = ((digits < 0) | (digits > 9)).any(axis=1)
+            if bad.any():
+                raise ValueError(f"Non-digit character in {field.name} on line {int(np.argmax(bad)) + 1}")
+            weights = 10 ** np.arange(field.width - 1, -1, -1, dtype=np.int64)
+            values = digits @ weights
+            columns[field.name] = values / 10 ** field.scale if field.scale else values
+        return columns
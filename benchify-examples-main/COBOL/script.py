@@ -3,9 +3,103 @@ import csv
 import shutil
 import os
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 import platform
 import math
+import numpy as np
+from copybook import Copybook
+import hashlib
+import logging
+import queue
+import select
+import sqlite3
+import sys
+import time
+import warnings
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# All diagnostics go through these loggers; nothing is printed unless the
+# application (or configure_logging()) attaches a handler. Per-record DEBUG
+# output is only built when DEBUG is enabled, so the default path is silent
+# and does no formatting work.
+logger = logging.getLogger("payroll")
+logger.addHandler(logging.NullHandler())
+
+# Structured timing events: one INFO record per phase (compile, write, exec,
+# parse) with `phase`, `duration` (seconds) and `records` attributes
+timing_logger = logging.getLogger("payroll.timing")
+
+def configure_logging(level: int = logging.DEBUG, stream=None) -> logging.Handler:
+    """
+    Prints payroll diagnostics as plain lines, like the original debug prints.
+    
+    Args:
+        level: Minimum level to show; DEBUG includes per-record output
+        stream: Where to write (defaults to sys.stdout)
+    
+    Returns:
+        The installed handler, so callers can remove it again
+    """
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return handler
+
+class TimingCollector(logging.Handler):
+    """
+    Logging handler that collects timing events as dicts for metrics.
+    
+    Example:
+        with TimingCollector() as timings:
+            process_payroll_cobol(employee_records)
+        timings.events  # [{"phase": "compile", "duration": 0.0001, "records": None}, ...]
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.events = []
+        self._previous_level = None
+
+    def emit(self, record: logging.LogRecord):
+        self.events.append({
+            "phase": record.phase,
+            "duration": record.duration,
+            "records": getattr(record, "records", None),
+        })
+
+    def __enter__(self):
+        self._previous_level = timing_logger.level
+        if not timing_logger.isEnabledFor(logging.INFO):
+            timing_logger.setLevel(logging.INFO)
+        timing_logger.addHandler(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        timing_logger.removeHandler(self)
+        timing_logger.setLevel(self._previous_level)
+
+@contextmanager
+def _timed(phase: str, records: Optional[int] = None):
+    """Emits a timing event for the enclosed block if anyone is listening."""
+    if not timing_logger.isEnabledFor(logging.INFO):
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        timing_logger.info("%s took %.6fs", phase, duration,
+                           extra={"phase": phase, "duration": duration, "records": records})
 
 @dataclass
 class EmployeeRecord: # Class for EmployeeRecords
@@ -23,22 +117,171 @@ class EmployeeRecord: # Class for EmployeeRecords
     hourly_rate: float # cannot be an inf or NaN
     tax_deduction: float # cannot be an inf or NaN
 
-def install_cobc_and_compile_script():
+# EMPLOYEE-RECORD from payroll.cbl, keyed by the EmployeeRecord field names
+EMPLOYEE_RECORD_LAYOUT = Copybook.from_pic([
+    ("emp_id", "X(5)"),             # EMP-ID
+    ("hours_worked", "9(3)"),       # HOURS-WORKED
+    ("hourly_rate", "9(5)V99"),     # HOURLY-RATE
+    ("tax_deduction", "9(5)V99"),   # TAX-DEDUCTION
+])
+EMPLOYEE_RECORD_WIDTH = EMPLOYEE_RECORD_LAYOUT.record_width
+
+class EmployeeBatch:
     """
-    Installs GNU COBOL compiler if not present and compiles the COBOL payroll script.
+    Columnar (struct-of-arrays) container for many employee payroll records.
     
-    This function:
-    1. Checks if cobc compiler is installed
-    2. If not installed, attempts to install it using the appropriate package manager
-    3. Compiles payroll.cbl into an executable
+    Holds one NumPy column per EmployeeRecord field instead of one Python
+    object per employee: emp_id is a fixed-width `S5` byte-string column (the
+    width of EMP-ID, longer IDs are truncated just like the COBOL bridge does)
+    and the numeric fields are float64. That is 29 bytes per employee instead
+    of a few hundred for a dataclass instance with its dict and boxed floats.
+    
+    Iterating a batch yields EmployeeRecord objects, so it can be passed
+    anywhere a List[EmployeeRecord] is accepted; process_payroll() and the
+    columnar engine use the columns directly.
+    
+    Attributes:
+        emp_id: ndarray of dtype S5
+        hours_worked, hourly_rate, tax_deduction: float64 ndarrays
+    """
+    __slots__ = ("emp_id", "hours_worked", "hourly_rate", "tax_deduction")
+
+    DTYPE = np.dtype([
+        ("emp_id", "S5"),
+        ("hours_worked", "f8"),
+        ("hourly_rate", "f8"),
+        ("tax_deduction", "f8"),
+    ])
+
+    def __init__(self, emp_id, hours_worked, hourly_rate, tax_deduction):
+        # Raises the same ValueError as format_employee_record() for a non-ASCII emp_id
+        self.emp_id = EMPLOYEE_RECORD_LAYOUT.scale({"emp_id": emp_id})["emp_id"]
+        self.hours_worked = np.asarray(hours_worked, dtype=np.float64)
+        self.hourly_rate = np.asarray(hourly_rate, dtype=np.float64)
+        self.tax_deduction = np.asarray(tax_deduction, dtype=np.float64)
+        if not (self.emp_id.shape == self.hours_worked.shape
+                == self.hourly_rate.shape == self.tax_deduction.shape) or self.emp_id.ndim != 1:
+            raise ValueError("EmployeeBatch columns must be one-dimensional and of equal length")
+
+    @classmethod
+    def from_structured(cls, table: np.ndarray) -> "EmployeeBatch":
+        """Builds a batch from a structured array with the fields of DTYPE."""
+        return cls.from_columns(table)
+
+    @classmethod
+    def from_records(cls, employee_records: Iterable[EmployeeRecord]) -> "EmployeeBatch":
+        """
+        Builds a batch from EmployeeRecord objects.
+        
+        Raises:
+            ValueError: If an emp_id is not ASCII within its first 5 characters,
+                        with the message format_employee_record() gives
+        """
+        rows = [(r.emp_id, r.hours_worked, r.hourly_rate, r.tax_deduction) for r in employee_records]
+        try:
+            table = np.array(rows, dtype=cls.DTYPE)
+        except UnicodeEncodeError:
+            columns = list(zip(*rows))
+            return cls(*columns)
+        return cls.from_structured(table)
+
+    @classmethod
+    def from_csv(cls, source) -> "EmployeeBatch":
+        """
+        Loads a batch from CSV with an emp_id,hours_worked,hourly_rate,tax_deduction header.
+        
+        Columns may appear in any order. Parsing is done by np.loadtxt in bulk;
+        fields may be quoted as in the csv module (e.g. "00123" or "12,34").
+        
+        Args:
+            source: Path or text file object
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, newline="") as f:
+                return cls.from_csv(f)
+        header = next(csv.reader([source.readline()]))
+        header = [name.strip() for name in header]
+        if sorted(header) != sorted(cls.DTYPE.names):
+            raise ValueError(f"CSV header must contain exactly {', '.join(cls.DTYPE.names)}; got {header}")
+        dtype = np.dtype([(name, cls.DTYPE[name]) for name in header])
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="loadtxt: input contained no data")
+            table = np.loadtxt(source, delimiter=",", quotechar='"', dtype=dtype, ndmin=1)
+        return cls.from_structured(table)
+
+    @classmethod
+    def from_fixed_width(cls, data) -> "EmployeeBatch":
+        """
+        Parses the newline-separated EMPLOYEE-RECORD format that payroll.cbl reads.
+        
+        Raises:
+            ValueError: If a line has the wrong width or a numeric field is not all digits
+        """
+        return cls.from_columns(EMPLOYEE_RECORD_LAYOUT.decode(data))
+
+    @classmethod
+    def from_columns(cls, columns) -> "EmployeeBatch":
+        """Builds a batch from a mapping of field name to array-like."""
+        return cls(columns["emp_id"], columns["hours_worked"], columns["hourly_rate"], columns["tax_deduction"])
+
+    def columns(self) -> dict:
+        """Returns the columns as a mapping of field name to ndarray."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_fixed_width(self) -> bytearray:
+        """
+        Encodes the batch as newline-terminated EMPLOYEE-RECORD lines in one buffer.
+        
+        Raises:
+            ValueError: For the first record that does not fit the PIC clauses
+        """
+        return EMPLOYEE_RECORD_LAYOUT.encode(self.columns())
+
+    def __len__(self) -> int:
+        return len(self.emp_id)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return EmployeeRecord(
+                emp_id=self.emp_id[index].decode("ascii"),
+                hours_worked=float(self.hours_worked[index]),
+                hourly_rate=float(self.hourly_rate[index]),
+                tax_deduction=float(self.tax_deduction[index]),
+            )
+        return EmployeeBatch(self.emp_id[index], self.hours_worked[index],
+                             self.hourly_rate[index], self.tax_deduction[index])
+
+    def __iter__(self) -> Iterator[EmployeeRecord]:
+        for emp_id, hours, rate, deduction in zip(self.emp_id.tolist(), self.hours_worked.tolist(),
+                                                  self.hourly_rate.tolist(), self.tax_deduction.tolist()):
+            yield EmployeeRecord(emp_id.decode("ascii"), hours, rate, deduction)
+
+    def __repr__(self) -> str:
+        return f"EmployeeBatch(<{len(self)} records>)"
+
+# Flags passed to cobc; part of the compiled-artifact cache key
+COBC_FLAGS = ("-x",)
+
+# Compiled binaries live here, one file per (source hash, cobc version, flags)
+COBOL_CACHE_DIR = os.environ.get(
+    "PAYROLL_COBOL_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cobol_cache"),
+)
+
+# In-process memo: (source path, mtime, size) -> compiled binary path
+_compiled_binaries = {}
+_cobc_version = None
+
+def ensure_cobc_installed():
+    """
+    Installs GNU COBOL compiler if not present.
     
     Raises:
-        FileNotFoundError: If payroll.cbl is missing
-        subprocess.CalledProcessError: If installation or compilation fails
+        subprocess.CalledProcessError: If installation fails
         Exception: If on an unsupported OS or Linux distribution
     """
     if shutil.which("cobc") is None:
-        print("GNU COBOL (cobc) is not installed. Installing it now...")
+        logger.warning("GNU COBOL (cobc) is not installed. Installing it now...")
         try:
             os_name = platform.system()
             if os_name == "Linux":
@@ -61,30 +304,142 @@ def install_cobc_and_compile_script():
             else:
                 raise Exception("Unsupported operating system. Please install GNU COBOL manually.")
         except subprocess.CalledProcessError as e:
-            print("Failed to install GNU COBOL. Please install it manually.")
+            logger.error("Failed to install GNU COBOL. Please install it manually.")
             raise e
     else:
-        print("GNU COBOL (cobc) is already installed.")
+        logger.debug("GNU COBOL (cobc) is already installed.")
+
+def get_cobc_version() -> str:
+    """
+    Returns the output of `cobc --version`.
+    
+    The output is memoized per process and in COBOL_CACHE_DIR, keyed on the
+    resolved path, mtime and size of the cobc binary, so a fresh process
+    whose binary is already compiled does not spawn cobc at all. Upgrading
+    cobc changes the key and the version is queried again.
+    """
+    global _cobc_version
+    if _cobc_version is None:
+        cobc = shutil.which("cobc") or "cobc"
+        try:
+            cobc = os.path.realpath(cobc)
+            stat = os.stat(cobc)
+        except OSError:
+            stat = None
+        memo_path = None
+        if stat is not None:
+            key = f"{cobc}\0{stat.st_mtime_ns}\0{stat.st_size}".encode("utf-8")
+            memo_path = os.path.join(COBOL_CACHE_DIR, f"cobc-version-{hashlib.sha256(key).hexdigest()[:16]}")
+            try:
+                with open(memo_path, encoding="utf-8") as f:
+                    _cobc_version = f.read()
+                return _cobc_version
+            except OSError:
+                pass
+        result = subprocess.run([cobc, "--version"], capture_output=True, text=True, check=True)
+        _cobc_version = result.stdout
+        if memo_path is not None:
+            try:
+                os.makedirs(COBOL_CACHE_DIR, exist_ok=True)
+                tmp_path = f"{memo_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(_cobc_version)
+                os.replace(tmp_path, memo_path)
+            except OSError as e:
+                logger.debug("Could not cache the cobc version in %s: %s", COBOL_CACHE_DIR, e)
+    return _cobc_version
+
+def _cobol_cache_key(source: bytes) -> str:
+    """Hashes the COBOL source together with the compiler version and flags."""
+    digest = hashlib.sha256()
+    digest.update(source)
+    digest.update(b"\0")
+    digest.update(get_cobc_version().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(" ".join(COBC_FLAGS).encode("utf-8"))
+    return digest.hexdigest()
+
+@contextmanager
+def _cache_lock(lock_path: str):
+    """Exclusive inter-process lock around a cache entry (no-op without fcntl)."""
+    with open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def install_cobc_and_compile_script(source_name: str = "payroll.cbl") -> str:
+    """
+    Installs GNU COBOL compiler if not present and compiles the COBOL payroll script.
     
+    This function:
+    1. Checks if cobc compiler is installed
+    2. If not installed, attempts to install it using the appropriate package manager
+    3. Compiles payroll.cbl into an executable, unless an up-to-date binary is cached
+    
+    Compiled binaries are cached in COBOL_CACHE_DIR under a key derived from the
+    source contents, the cobc version and COBC_FLAGS. The cache is safe to share
+    between processes: compilation happens under a file lock and the binary is
+    moved into place atomically. Repeated calls in the same process only stat
+    the source file, and a fresh process whose binary is cached does not run
+    cobc at all (see get_cobc_version()).
+    
+    Args:
+        source_name: COBOL source file, relative to this script's directory
+    
+    Returns:
+        Absolute path to the compiled executable
+    
+    Raises:
+        FileNotFoundError: If payroll.cbl is missing
+        subprocess.CalledProcessError: If installation or compilation fails
+        Exception: If on an unsupported OS or Linux distribution
+    """
     # Get the directory where this script resides
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    cobol_script_path = os.path.join(script_dir, "payroll.cbl")
+    cobol_script_path = os.path.join(script_dir, source_name)
     
     if not os.path.exists(cobol_script_path):
-        raise FileNotFoundError(f"The COBOL script 'payroll.cbl' was not found in {script_dir}")
-    
-    # Always recompile to ensure we have the latest version
-    output_path = os.path.join(script_dir, "payroll")
-    if os.path.exists(output_path):
-        os.remove(output_path)
-    print("Compiling payroll.cbl...")
-    compile_command = ["cobc", "-x", "-o", output_path, cobol_script_path]
-    try:
-        subprocess.run(compile_command, check=True)
-        print("Compilation successful.")
-    except subprocess.CalledProcessError as e:
-        print("Error compiling COBOL script.")
-        raise e
+        raise FileNotFoundError(f"The COBOL script '{source_name}' was not found in {script_dir}")
+    
+    stat = os.stat(cobol_script_path)
+    memo_key = (cobol_script_path, stat.st_mtime_ns, stat.st_size)
+    output_path = _compiled_binaries.get(memo_key)
+    if output_path is not None and os.path.exists(output_path):
+        return output_path
+
+    ensure_cobc_installed()
+
+    with open(cobol_script_path, "rb") as f:
+        cache_key = _cobol_cache_key(f.read())
+
+    os.makedirs(COBOL_CACHE_DIR, exist_ok=True)
+    stem = os.path.splitext(source_name)[0]
+    output_path = os.path.join(COBOL_CACHE_DIR, f"{stem}-{cache_key[:16]}")
+
+    with _cache_lock(output_path + ".lock"):
+        if os.path.exists(output_path):
+            logger.debug("Using cached %s binary: %s", stem, output_path)
+        else:
+            logger.info("Compiling %s...", source_name)
+            tmp_path = f"{output_path}.{os.getpid()}.tmp"
+            compile_command = ["cobc", *COBC_FLAGS, "-o", tmp_path, cobol_script_path]
+            try:
+                subprocess.run(compile_command, check=True)
+                os.replace(tmp_path, output_path)
+                logger.info("Compilation successful.")
+            except subprocess.CalledProcessError as e:
+                logger.error("Error compiling COBOL script.")
+                raise e
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    _compiled_binaries[memo_key] = output_path
+    return output_path
 
 install_cobc_and_compile_script()
 
@@ -126,110 +481,729 @@ def format_pic_9_5_v_99(num: float) -> str: # Function to format data for cobol
     except OverflowError:
         raise ValueError("Number too large to represent in PIC 9(5)V99 format")
 
-def process_payroll_cobol(employee_records: List[EmployeeRecord]) -> List[Tuple[float, float]]:
+def format_employee_record(record: EmployeeRecord) -> str:
+    """
+    Formats an EmployeeRecord as one fixed-width EMPLOYEE-RECORD line (no newline).
+    
+    Layout: EMP-ID X(5), HOURS-WORKED 9(3), HOURLY-RATE 9(5)V99, TAX-DEDUCTION 9(5)V99.
+    
+    Raises:
+        ValueError: If a field is NaN, infinite or out of range for its PIC clause
+    """
+    return EMPLOYEE_RECORD_LAYOUT.format_record(
+        (record.emp_id, record.hours_worked, record.hourly_rate, record.tax_deduction)
+    )
+
+def parse_payroll_output_line(line: str) -> Tuple[float, float]:
+    """Parses one "EMP-ID,GROSS-PAY,NET-PAY" line into (gross_pay, net_pay)."""
+    _, gross_pay, net_pay = line.rsplit(",", 2)
+    return float(gross_pay), float(net_pay)
+
+def process_payroll_cobol(employee_records: Union[Iterable[EmployeeRecord], EmployeeBatch],
+                          pool: Optional["PayrollWorkerPool"] = None) -> List[Tuple[float, float]]:
     """
     Processes payroll by running a COBOL program and parsing its output.
     
     This function:
-    1. Ensures COBOL compiler is installed
-    2. Creates a temporary input file with employee data
+    1. Ensures COBOL compiler is installed and the program is compiled (cached)
+    2. Creates a temporary input file with employee data (removed afterwards)
     3. Runs the COBOL payroll program
     4. Parses the CSV output to extract gross and net pay
     
+    For large inputs prefer iter_payroll_cobol(), which streams records through
+    a pipe instead of materialising a file and the whole output in memory.
+    
     Args:
-        employee_records: List of EmployeeRecord objects containing payroll data
+        employee_records: List of EmployeeRecord objects (or an EmployeeBatch) containing payroll data
+        pool: Optional PayrollWorkerPool; when given, the batch is streamed to a
+              long-running COBOL worker instead of spawning ./payroll
         
     Returns:
         List of tuples containing (gross_pay, net_pay) for each employee
         
     Raises:
+        ValueError: If a record does not fit EMPLOYEE-RECORD, with the same
+                    message on every path (format_employee_record(),
+                    EmployeeBatch, iter_payroll_cobol(), the worker pool):
+                    NaN, infinite or out-of-range hours, rate or deduction,
+                    or an emp_id that is not ASCII. Before the copybook
+                    codec, infinite hours raised OverflowError and NaN hours
+                    "cannot convert float NaN to integer".
         Various exceptions from subprocess calls and file operations
     """
-    # 1) Ensure GNU COBOL is installed & compile the COBOL code
-    install_cobc_and_compile_script()
+    if pool is not None:
+        return pool.process(employee_records)
+
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    # 1) Ensure GNU COBOL is installed & the COBOL code is compiled (cached)
+    with _timed("compile"):
+        payroll_binary = install_cobc_and_compile_script()
 
     # 2) Create a temporary input file with random name
     temp_file = f"temp_payroll_input_{os.urandom(8).hex()}.txt"
 
     # 3) Write data in the fixed-length format
-    print("=== Debug: Writing the following lines to input file ===")
     script_dir = os.path.dirname(os.path.abspath(__file__))
     temp_file_path = os.path.join(script_dir, temp_file)
-    with open(temp_file_path, 'w', newline='') as f:
-        for record in employee_records:
-            # EMP-ID: 5 chars
-            emp_id_str = record.emp_id[:5].ljust(5)
+    batch = employee_records
+    if not isinstance(batch, EmployeeBatch):
+        batch = EmployeeBatch.from_records(employee_records)
+    try:
+        with _timed("write", len(batch)):
+            data = batch.to_fixed_width()
+            with open(temp_file_path, 'wb') as f:
+                f.write(data)
+        if debug:
+            logger.debug("=== Debug: Writing the following lines to input file ===\n%s"
+                         "=======================================================", data.decode("ascii"))
+
+        # 4) Run the compiled COBOL program with the input file as an argument
+        logger.debug("Running the COBOL payroll program with file: %s", temp_file_path)
+        run_command = [payroll_binary, temp_file_path]
+
+        try:
+            with _timed("exec", len(batch)):
+                result = subprocess.run(run_command, capture_output=True, text=True, check=True, cwd=script_dir)
+        except subprocess.CalledProcessError as e:
+            with open(temp_file_path, 'r') as input_f:
+                input_contents = input_f.read()
+            logger.error(
+                "Error running COBOL program. Exit code: %s\n"
+                "Command that failed: %s\n"
+                "=== Standard output ===\n%s\n"
+                "=== Standard error ===\n%s\n"
+                "=== Input file contents ===\n%s",
+                e.returncode, ' '.join(e.cmd),
+                e.stdout if e.stdout else "<no output>",
+                e.stderr if e.stderr else "<no error output>",
+                input_contents,
+            )
+            raise e
+    finally:
+        # Never leave the input file behind, whether or not COBOL succeeded
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+    # 5) Process the COBOL output
+    with _timed("parse", len(batch)):
+        logger.debug("Processing COBOL output...")
+        output_lines = result.stdout.splitlines()
+        if not output_lines:
+            logger.warning("=== No output from COBOL ===")
+            return []
+
+        if debug:
+            logger.debug("=== Raw COBOL Output ===\n%s\n=========================", "\n".join(output_lines))
 
-            # HOURS: 3 digits
-            hours_str = f"{int(record.hours_worked):03d}"
+        # The first line should be: "EMP-ID,GROSS-PAY,NET-PAY"
+        reader = csv.DictReader(output_lines)
+        if not reader.fieldnames or "EMP-ID" not in reader.fieldnames:
+            logger.error("=== Invalid CSV output format ===\n%s", result.stdout)
+            return []
 
-            # HOURLY-RATE: 7 digits
-            hourly_rate_str = format_pic_9_5_v_99(record.hourly_rate)
+        results = []
+        for row in reader:
+            try:
+                emp_id = row["EMP-ID"]
+                gross_pay = float(row["GROSS-PAY"])
+                net_pay = float(row["NET-PAY"])
 
-            # TAX-DEDUCTION: 7 digits
-            tax_deduction_str = format_pic_9_5_v_99(record.tax_deduction)
+                if debug:
+                    logger.debug("Employee ID: %s\nGross Pay:  $%.2f\nNet Pay:    $%.2f", emp_id, gross_pay, net_pay)
+                results.append((gross_pay, net_pay))
+            except KeyError as e:
+                logger.error("Missing required column in output: %s. Available columns: %s", e, reader.fieldnames)
+            except ValueError as e:
+                logger.error("Invalid number format in output for employee %s: %s", emp_id, e)
 
-            line = emp_id_str + hours_str + hourly_rate_str + tax_deduction_str
-            print(line)  # Print for debug
-            f.write(line + "\n")
-    print("=======================================================")
+    return results
+
+# Sentinels understood by payroll_loop.cbl, each sent as a line of its own; the
+# program matches the whole line, so an employee with one of these IDs is safe
+END_OF_BATCH = "*EOB*"
+END_OF_INPUT = "*EOF*"
+END_OF_BATCH_LINE = (END_OF_BATCH + "\n").encode("ascii")
+END_OF_INPUT_LINE = (END_OF_INPUT + "\n").encode("ascii")
+
+# Seconds a worker may go without answering before it is killed and replaced
+WORKER_READ_TIMEOUT = 60.0
+
+# Records sent per pipe round-trip. Keeps both the request and the reply well
+# below the OS pipe buffer, so writing a chunk can never deadlock on a worker
+# that is blocked writing its output.
+WORKER_CHUNK_SIZE = 512
+
+class PayrollWorkerError(RuntimeError):
+    """Raised when a COBOL payroll worker dies or answers out of protocol."""
+
+class PayrollWorker:
+    """
+    One long-running payroll_loop process, fed over stdin/stdout pipes.
+    
+    Not thread-safe; PayrollWorkerPool hands each worker to one caller at a time.
+    """
+
+    def __init__(self, binary: str, read_timeout: Optional[float] = WORKER_READ_TIMEOUT):
+        """
+        Args:
+            binary: Compiled payroll_loop executable
+            read_timeout: Seconds run() waits for the next line of output
+                          before raising PayrollWorkerError; None waits forever
+        
+        Raises:
+            PayrollWorkerError: If neither stdbuf nor gstdbuf is installed
+        """
+        # The COBOL runtime uses C stdio, which fully buffers a piped stdout,
+        # so without line buffering the *EOB* reply would never arrive.
+        stdbuf = shutil.which("stdbuf") or shutil.which("gstdbuf")
+        if stdbuf is None:
+            raise PayrollWorkerError(
+                "PayrollWorker needs stdbuf (GNU coreutils) to line-buffer the COBOL worker's output; "
+                "on macOS run `brew install coreutils` for gstdbuf"
+            )
+        self.read_timeout = read_timeout
+        self._buffer = bytearray()
+        self.process = subprocess.Popen(
+            [stdbuf, "-oL", binary],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _readline(self) -> bytes:
+        """Reads one line of output (b"" at end of output), waiting at most read_timeout."""
+        deadline = None if self.read_timeout is None else time.monotonic() + self.read_timeout
+        fd = self.process.stdout.fileno()
+        while True:
+            end = self._buffer.find(b"\n")
+            if end >= 0:
+                line = bytes(self._buffer[:end + 1])
+                del self._buffer[:end + 1]
+                return line
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                raise PayrollWorkerError(
+                    f"COBOL worker {self.process.pid} sent nothing for {self.read_timeout}s"
+                )
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                line = bytes(self._buffer)
+                self._buffer.clear()
+                return line
+            self._buffer += chunk
+
+    def run(self, data) -> List[Tuple[float, float]]:
+        """Sends encoded EMPLOYEE-RECORD lines to the worker and returns their results."""
+        data = memoryview(data)
+        line_width = EMPLOYEE_RECORD_LAYOUT.line_width
+        chunk_bytes = WORKER_CHUNK_SIZE * line_width
+        results = []
+        for start in range(0, len(data), chunk_bytes):
+            chunk = data[start:start + chunk_bytes]
+            expected = len(results) + len(chunk) // line_width
+            try:
+                self.process.stdin.write(chunk)
+                self.process.stdin.write(END_OF_BATCH_LINE)
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                raise PayrollWorkerError(f"COBOL worker {self.process.pid} stopped accepting input") from e
+            while True:
+                line = self._readline()
+                if not line:
+                    raise PayrollWorkerError(
+                        f"COBOL worker {self.process.pid} exited with code {self.process.poll()}"
+                    )
+                if line == END_OF_BATCH_LINE:
+                    break
+                try:
+                    results.append(parse_payroll_output_line(line.decode("ascii").rstrip("\n")))
+                except ValueError as e:
+                    raise PayrollWorkerError(
+                        f"COBOL worker {self.process.pid} sent unexpected output: {line!r}"
+                    ) from e
+            if len(results) != expected:
+                raise PayrollWorkerError(
+                    f"COBOL worker {self.process.pid} returned {len(results)} results "
+                    f"for {expected} records"
+                )
+        return results
+
+    def close(self, timeout: float = 5.0):
+        if self.alive():
+            try:
+                self.process.stdin.write(END_OF_INPUT_LINE)
+                self.process.stdin.close()
+                self.process.wait(timeout=timeout)
+            except (BrokenPipeError, OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            if stream is not None and not stream.closed:
+                stream.close()
+
+class PayrollWorkerPool:
+    """
+    Pool of long-running COBOL payroll processes.
+    
+    Instead of writing a temp file and forking ./payroll for every batch, the
+    pool keeps `size` copies of payroll_loop.cbl alive and streams records to
+    them over pipes. Each call to process() checks out an idle worker, so at
+    most `size` batches are in flight and further callers block until a worker
+    frees up (back-pressure). A worker that crashes, or sends nothing for
+    read_timeout seconds, is killed and replaced and the batch is retried once
+    on the fresh process. Workers need stdbuf (or gstdbuf) on the PATH.
+    
+    Example:
+        with PayrollWorkerPool(size=4) as pool:
+            results = process_payroll_cobol(employee_records, pool=pool)
+    """
+
+    def __init__(self, size: Optional[int] = None, timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = WORKER_READ_TIMEOUT):
+        """
+        Args:
+            size: Number of worker processes (defaults to the CPU count)
+            timeout: Seconds process() waits for an idle worker before raising
+                     queue.Empty; None waits forever
+            read_timeout: Seconds a worker may go without answering before it
+                          is replaced; None waits forever
+        
+        Raises:
+            PayrollWorkerError: If stdbuf is not installed
+        """
+        self.size = size or os.cpu_count() or 1
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self.binary = install_cobc_and_compile_script("payroll_loop.cbl")
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(self.size):
+            worker = PayrollWorker(self.binary, self.read_timeout)
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+    def _replace(self, worker: PayrollWorker) -> PayrollWorker:
+        # The worker may be hung with a full stdin pipe, so kill it outright
+        if worker.alive():
+            worker.process.kill()
+            worker.process.wait()
+        worker.close()
+        fresh = PayrollWorker(self.binary, self.read_timeout)
+        with self._lock:
+            self._workers[self._workers.index(worker)] = fresh
+        return fresh
+
+    def process(self, employee_records: Union[List[EmployeeRecord], EmployeeBatch]) -> List[Tuple[float, float]]:
+        """
+        Runs a batch on an idle worker and returns (gross_pay, net_pay) per record.
+        
+        Raises:
+            ValueError: If a record cannot be formatted for COBOL
+            PayrollWorkerError: If the batch fails on two consecutive workers
+            queue.Empty: If no worker becomes idle within `timeout`
+        """
+        if self._closed:
+            raise RuntimeError("PayrollWorkerPool is closed")
+        batch = employee_records
+        if not isinstance(batch, EmployeeBatch):
+            batch = EmployeeBatch.from_records(employee_records)
+        if not len(batch):
+            return []
+        with _timed("write", len(batch)):
+            data = batch.to_fixed_width()
+        worker = self._idle.get(timeout=self.timeout)
+        try:
+            if not worker.alive():
+                worker = self._replace(worker)
+            try:
+                with _timed("exec", len(batch)):
+                    return worker.run(data)
+            except PayrollWorkerError:
+                worker = self._replace(worker)
+                return worker.run(data)
+        except PayrollWorkerError:
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        """Stops all workers. Safe to call more than once."""
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def iter_payroll_cobol(employee_records: Iterable[EmployeeRecord]) -> Iterator[Tuple[float, float]]:
+    """
+    Streams records through the COBOL payroll program and yields results as they arrive.
+    
+    Records are formatted and written to the stdin of a payroll_loop process
+    by a background thread while this generator reads its stdout line by
+    line, so memory use is constant regardless of how many records the
+    iterable produces, and nothing is written to disk.
+    
+    Args:
+        employee_records: Any iterable of EmployeeRecord (e.g. a generator over a CSV file)
+        
+    Yields:
+        (gross_pay, net_pay) for each employee, in input order
+        
+    Raises:
+        ValueError: If a record cannot be formatted for COBOL; results for the
+                    records before it have already been yielded
+        subprocess.CalledProcessError: If the COBOL program exits with an error
+        PayrollWorkerError: If the program stops before answering every record
+    """
+    payroll_binary = install_cobc_and_compile_script("payroll_loop.cbl")
+    process = subprocess.Popen(
+        [payroll_binary],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    writer_errors = []
+    sent = 0
 
-    # 4) Run the compiled COBOL program with the input file as an argument
-    print(f"Running the COBOL payroll program with file: {temp_file_path}")
-    run_command = ["./payroll", temp_file_path]
+    def feed():
+        nonlocal sent
+        try:
+            for record in employee_records:
+                process.stdin.write(format_employee_record(record) + "\n")
+                sent += 1
+            process.stdin.write(END_OF_INPUT + "\n")
+        except BrokenPipeError:
+            pass  # the reader side already gave up; it reports the exit status
+        except Exception as e:
+            writer_errors.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
 
+    writer = threading.Thread(target=feed, name="payroll-cobol-feeder", daemon=True)
+    writer.start()
+    received = 0
     try:
-        result = subprocess.run(run_command, capture_output=True, text=True, check=True, cwd=script_dir)
-    except subprocess.CalledProcessError as e:
-        print(f"Error running COBOL program. Exit code: {e.returncode}")
-        print(f"Command that failed: {' '.join(e.cmd)}")
-        print("=== Standard output ===")
-        print(e.stdout if e.stdout else "<no output>")
-        print("=== Standard error ===")
-        print(e.stderr if e.stderr else "<no error output>")
-        print("=== Input file contents ===")
-        with open(temp_file, 'r') as input_f:
-            print(input_f.read())
-        raise e
+        for line in process.stdout:
+            yield parse_payroll_output_line(line.rstrip("\n"))
+            received += 1
+        returncode = process.wait()
+        writer.join()
+        if writer_errors:
+            raise writer_errors[0]
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, [payroll_binary])
+        if received != sent:
+            raise PayrollWorkerError(
+                f"COBOL payroll program returned {received} results for {sent} records"
+            )
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        writer.join()
 
-    # 5) Process the COBOL output
-    print("Processing COBOL output...")
-    output_lines = result.stdout.splitlines()
-    if not output_lines:
-        print("=== No output from COBOL ===")
-        return []
+class PayrollParallelError(RuntimeError):
+    """
+    Raised by process_payroll_parallel() when one or more chunks fail.
+    
+    Attributes:
+        failures: List of (chunk_index, start, stop, exception) for every failed
+                  chunk, where records[start:stop] is the chunk's slice of the input
+    """
 
-    print("=== Raw COBOL Output ===")
-    for line in output_lines:
-        print(line)
-    print("=========================")
+    def __init__(self, failures: List[Tuple[int, int, int, BaseException]]):
+        self.failures = failures
+        chunk_index, start, stop, error = failures[0]
+        super().__init__(
+            f"{len(failures)} payroll chunk(s) failed; first was chunk {chunk_index} "
+            f"(records {start}-{stop - 1}): {type(error).__name__}: {error}"
+        )
 
-    # The first line should be: "EMP-ID,GROSS-PAY,NET-PAY"
-    reader = csv.DictReader(output_lines)
-    if not reader.fieldnames or "EMP-ID" not in reader.fieldnames:
-        print(f"=== Invalid CSV output format ===\n{result.stdout}")
+def process_payroll_parallel(employee_records: Union[List[EmployeeRecord], EmployeeBatch],
+                             workers: Optional[int] = None,
+                             chunk_size: Optional[int] = None,
+                             pool: Optional[PayrollWorkerPool] = None) -> List[Tuple[float, float]]:
+    """
+    Runs the COBOL payroll over several cores by sharding the input.
+    
+    The records are split into contiguous chunks which are processed
+    concurrently by a PayrollWorkerPool (threads only wait on the worker
+    pipes, the COBOL processes do the work in parallel). Results are merged
+    back in input order. Every chunk runs to completion before errors are
+    reported, so one bad record does not hide failures in other chunks.
+    
+    Args:
+        employee_records: List of EmployeeRecord objects or an EmployeeBatch
+        workers: Number of COBOL processes (defaults to the CPU count, or the
+                 size of `pool`)
+        chunk_size: Records per chunk (defaults to an even split across workers)
+        pool: Existing PayrollWorkerPool to use; by default a pool is started
+              for this call and shut down afterwards
+    
+    Returns:
+        List of tuples containing (gross_pay, net_pay) for each employee
+    
+    Raises:
+        PayrollParallelError: If any chunk fails, listing each failed chunk and
+                              the record range it covered
+    """
+    batch = employee_records
+    if not isinstance(batch, EmployeeBatch):
+        batch = EmployeeBatch.from_records(employee_records)
+    if not len(batch):
         return []
+    workers = workers or (pool.size if pool is not None else os.cpu_count() or 1)
+    chunk_size = chunk_size or math.ceil(len(batch) / workers)
+    bounds = [(start, min(start + chunk_size, len(batch))) for start in range(0, len(batch), chunk_size)]
 
-    results = []
-    for row in reader:
-        try:
-            emp_id = row["EMP-ID"]
-            gross_pay = float(row["GROSS-PAY"])
-            net_pay = float(row["NET-PAY"])
-            
-            # Debug prints
-            print(f"Employee ID: {emp_id}")
-            print(f"Gross Pay:  ${gross_pay:.2f}")
-            print(f"Net Pay:    ${net_pay:.2f}")
-            results.append((gross_pay, net_pay))
-        except KeyError as e:
-            print(f"Missing required column in output: {e}. Available columns: {reader.fieldnames}")
-        except ValueError as e:
-            print(f"Invalid number format in output for employee {emp_id}: {e}")
+    own_pool = pool is None
+    if own_pool:
+        pool = PayrollWorkerPool(size=min(workers, len(bounds)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="payroll-chunk") as executor:
+            futures = [executor.submit(pool.process, batch[start:stop]) for start, stop in bounds]
+            results, failures = [], []
+            for chunk_index, (future, (start, stop)) in enumerate(zip(futures, bounds)):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    failures.append((chunk_index, start, stop, e))
+    finally:
+        if own_pool:
+            pool.close()
 
+    if failures:
+        raise PayrollParallelError(failures) from failures[0][3]
     return results
 
-def process_payroll(employee_records: List[EmployeeRecord]) -> List[Tuple[float, float]]: 
+# (emp_id, hours_worked, hourly_rate, tax_deduction)
+PayrollKey = Tuple[str, float, float, float]
+
+class PayrollResultCache:
+    """
+    Keyed cache of (gross_pay, net_pay) results for incremental pay runs.
+    
+    Results are keyed on the full input record (emp_id, hours_worked,
+    hourly_rate, tax_deduction), so a changed field is simply a different key.
+    An in-memory LRU holds at most `maxsize` entries; when `path` is given,
+    every result is also written through to an SQLite file, which survives
+    restarts and is consulted on memory misses.
+    
+    A cache must only be shared between runs of the same engine, since
+    process_payroll() and the COBOL bridge do not agree on every input.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 1_000_000, path: Optional[str] = None):
+        """
+        Args:
+            maxsize: Maximum in-memory entries (None for unbounded)
+            path: Optional SQLite file for the persistent store
+        """
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[PayrollKey, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS payroll_results ("
+                " emp_id TEXT, hours_worked REAL, hourly_rate REAL, tax_deduction REAL,"
+                " gross_pay REAL, net_pay REAL,"
+                " PRIMARY KEY (emp_id, hours_worked, hourly_rate, tax_deduction))"
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get_many(self, keys: Sequence[PayrollKey]) -> Dict[PayrollKey, Tuple[float, float]]:
+        """Returns the cached results for whichever of `keys` are present."""
+        found = {}
+        misses = []
+        with self._lock:
+            for key in keys:
+                value = self._memory.get(key)
+                if value is None:
+                    misses.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = value
+            if self._db is not None and misses:
+                from_disk = self._load(misses)
+                found.update(from_disk)
+                self._remember(from_disk.items())
+        return found
+
+    def put_many(self, items: Iterable[Tuple[PayrollKey, Tuple[float, float]]]):
+        """Stores results, evicting the least recently used entries beyond maxsize."""
+        items = list(items)
+        with self._lock:
+            self._remember(items)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO payroll_results VALUES (?, ?, ?, ?, ?, ?)",
+                    [(*key, *value) for key, value in items],
+                )
+                self._db.commit()
+
+    def clear(self):
+        """Drops all entries, including the persistent store."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM payroll_results")
+                self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, items):
+        for key, value in items:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _load(self, keys: Sequence[PayrollKey]) -> Dict[PayrollKey, Tuple[float, float]]:
+        # Bulk lookup: stage the keys in a temp table and join on the primary key
+        self._db.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS lookup_keys"
+            " (emp_id TEXT, hours_worked REAL, hourly_rate REAL, tax_deduction REAL)"
+        )
+        self._db.execute("DELETE FROM lookup_keys")
+        self._db.executemany("INSERT INTO lookup_keys VALUES (?, ?, ?, ?)", keys)
+        rows = self._db.execute(
+            "SELECT r.emp_id, r.hours_worked, r.hourly_rate, r.tax_deduction, r.gross_pay, r.net_pay"
+            " FROM lookup_keys k JOIN payroll_results r"
+            " USING (emp_id, hours_worked, hourly_rate, tax_deduction)"
+        )
+        found = {}
+        for emp_id, hours, rate, deduction, gross_pay, net_pay in rows:
+            found[(emp_id, hours, rate, deduction)] = (gross_pay, net_pay)
+        self._db.execute("DELETE FROM lookup_keys")
+        return found
+
+def _payroll_keys(employee_records: Union[List[EmployeeRecord], EmployeeBatch]) -> List[PayrollKey]:
+    if isinstance(employee_records, EmployeeBatch):
+        batch = employee_records
+        return list(zip([emp_id.decode("ascii") for emp_id in batch.emp_id.tolist()],
+                        batch.hours_worked.tolist(), batch.hourly_rate.tolist(), batch.tax_deduction.tolist()))
+    return [(r.emp_id, r.hours_worked, r.hourly_rate, r.tax_deduction) for r in employee_records]
+
+def process_payroll_incremental(employee_records: Union[List[EmployeeRecord], EmployeeBatch],
+                                cache: PayrollResultCache,
+                                engine: Callable = None) -> List[Tuple[float, float]]:
+    """
+    Runs only new or changed records through `engine`, reusing cached results for the rest.
+    
+    Cached and freshly computed results are merged back in input order, so a
+    re-run after a small change costs time proportional to the change.
+    Duplicate records within one call are computed once.
+    
+    Args:
+        employee_records: List of EmployeeRecord objects or an EmployeeBatch
+        cache: PayrollResultCache to read from and fill
+        engine: Function with the process_payroll_cobol() signature
+                (defaults to process_payroll_cobol)
+    
+    Returns:
+        List of tuples containing (gross_pay, net_pay) for each employee
+    
+    Raises:
+        Whatever `engine` raises for the uncached records; nothing from that
+        call is cached in that case
+    """
+    engine = engine or process_payroll_cobol
+    keys = _payroll_keys(employee_records)
+    cached = cache.get_many(keys)
+
+    first_seen = {}
+    for index, key in enumerate(keys):
+        if key not in cached and key not in first_seen:
+            first_seen[key] = index
+    if first_seen:
+        indices = list(first_seen.values())
+        if isinstance(employee_records, EmployeeBatch):
+            todo = employee_records[np.array(indices, dtype=np.intp)]
+        else:
+            todo = [employee_records[index] for index in indices]
+        computed = engine(todo)
+        if len(computed) != len(indices):
+            raise RuntimeError(f"Payroll engine returned {len(computed)} results for {len(indices)} records")
+        fresh = list(zip(first_seen.keys(), computed))
+        cache.put_many(fresh)
+        cached.update(fresh)
+    logger.debug("Incremental payroll: %d records, %d computed", len(keys), len(first_seen))
+    return [cached[key] for key in keys]
+
+# PIC 9(7)V99 holds nine digits of cents; COBOL drops anything above them
+PIC_9_7_V_99_MODULUS = 10 ** 9
+
+def compute_payroll_cents(hours_worked, hourly_rate, tax_deduction) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Columnar payroll engine with the fixed-point semantics of payroll.cbl.
+    
+    Takes array-likes of equal length and returns (gross_cents, net_cents) as
+    int64 arrays of scaled cents. The inputs are converted exactly the way
+    process_payroll_cobol() writes them (hours truncated to an integer,
+    rate and deduction rounded to cents), and the results follow the COBOL
+    receiving fields, both PIC 9(7)V99:
+    
+    - high-order digits beyond 9999999.99 are truncated (no ON SIZE ERROR)
+    - the fields are unsigned, so a negative net pay is stored as its absolute value
+    
+    Raises:
+        ValueError: For the first record process_payroll_cobol() would reject,
+            with the same message
+    """
+    columns = {
+        "hours_worked": np.asarray(hours_worked, dtype=np.float64),
+        "hourly_rate": np.asarray(hourly_rate, dtype=np.float64),
+        "tax_deduction": np.asarray(tax_deduction, dtype=np.float64),
+    }
+    if len({column.shape for column in columns.values()}) != 1:
+        raise ValueError("hours_worked, hourly_rate and tax_deduction must have the same shape")
+
+    scaled = EMPLOYEE_RECORD_LAYOUT.scale(columns)
+    gross_cents = (scaled["hours_worked"] * scaled["hourly_rate"]) % PIC_9_7_V_99_MODULUS
+    net_cents = np.abs(gross_cents - scaled["tax_deduction"]) % PIC_9_7_V_99_MODULUS
+    return gross_cents, net_cents
+
+def process_payroll_columnar(hours_worked, hourly_rate, tax_deduction) -> List[Tuple[float, float]]:
+    """
+    Same results as process_payroll_cobol() for the given columns, computed in-process.
+    
+    Args:
+        hours_worked, hourly_rate, tax_deduction: Equal-length array-likes
+        
+    Returns:
+        List of tuples containing (gross_pay, net_pay) for each employee
+    """
+    gross_cents, net_cents = compute_payroll_cents(hours_worked, hourly_rate, tax_deduction)
+    # int64 / 100 is correctly rounded, exactly like float("0000800.00")
+    return list(zip((gross_cents / 100).tolist(), (net_cents / 100).tolist()))
+
+def process_payroll(employee_records: Union[List[EmployeeRecord], EmployeeBatch]) -> List[Tuple[float, float]]: 
     """ 
     Pure Python implementation of the COBOL payroll processing logic.
     
@@ -238,7 +1212,7 @@ def process_payroll(employee_records: List[EmployeeRecord]) -> List[Tuple[float,
     and throw the same exceptions in the same scenarios.
     
     Args:
-        employee_records: List of EmployeeRecord objects containing payroll data
+        employee_records: List of EmployeeRecord objects (or an EmployeeBatch) containing payroll data
     
     Returns:
         List of tuples containing (gross_pay, net_pay) for each employee
@@ -254,6 +1228,19 @@ def process_payroll(employee_records: List[EmployeeRecord]) -> List[Tuple[float,
     
     --> Please do NOT bother testing any other properties of this function.
     """
+    if isinstance(employee_records, EmployeeBatch):
+        # Same float64 arithmetic as the loop below, one column at a time
+        batch = employee_records
+        gross = batch.hours_worked * batch.hourly_rate
+        net = gross - batch.tax_deduction
+        results = list(zip(gross.tolist(), net.tolist()))
+        if logger.isEnabledFor(logging.DEBUG):
+            for emp_id, (gross_pay, net_pay) in zip(batch.emp_id.tolist(), results):
+                logger.debug("Employee ID: %s\nGross Pay: $%.2f\nNet Pay:   $%.2f",
+                             emp_id.decode('ascii'), gross_pay, net_pay)
+        return results
+
+    debug = logger.isEnabledFor(logging.DEBUG)
     results = []
     for record in employee_records:
         # Calculate gross pay and net pay
@@ -261,9 +1248,8 @@ def process_payroll(employee_records: List[EmployeeRecord]) -> List[Tuple[float,
         net_pay = gross_pay - record.tax_deduction
         
         # Display results
-        print(f"Employee ID: {record.emp_id}")
-        print(f"Gross Pay: ${gross_pay:.2f}")
-        print(f"Net Pay:   ${net_pay:.2f}")
+        if debug:
+            logger.debug("Employee ID: %s\nGross Pay: $%.2f\nNet Pay:   $%.2f", record.emp_id, gross_pay, net_pay)
         results.append((gross_pay, net_pay))
     
     return results # this SHOULD return the same result as process_payroll_cobol(employee_records)
@@ -0,0 +1,22 @@
+import io
+import shutil
+
+import pytest
+
+if shutil.which("cobc") is None:
+    pytest.skip("script.py compiles payroll.cbl on import and needs GNU COBOL (cobc)", allow_module_level=True)
+
+from script import EmployeeBatch
+
+def test_from_csv_honours_quoted_fields():
+    source = io.StringIO(
+        'emp_id,hours_worked,hourly_rate,tax_deduction\n'
+        '"00123",40,20,50\n'
+        '"1,2",1,"2.5",3\n'
+        'X,0,0,0\n'
+    )
+    batch = EmployeeBatch.from_csv(source)
+    assert batch.emp_id.tolist() == [b"00123", b"1,2", b"X"]
+    assert batch.hours_worked.tolist() == [40.0, 1.0, 0.0]
+    assert batch.hourly_rate.tolist() == [20.0, 2.5, 0.0]
+    assert batch.tax_deduction.tolist() == [50.0, 3.0, 0.0]
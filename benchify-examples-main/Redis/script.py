@@ -25,6 +25,23 @@ def redis_operations():
     exists = redis_client.exists('greeting')
     print(f"Does 'greeting' exist? {exists}")
 
+def redis_operations_pipelined(transaction=False):
+    # Same commands as redis_operations(), sent in one round-trip;
+    # transaction=True wraps them in MULTI/EXEC so they run atomically
+    redis_client = redis.Redis(host='localhost', port=6379, db=0)
+    pipe = redis_client.pipeline(transaction=transaction)
+    pipe.set('greeting', 'Hello, Redis!')
+    pipe.get('greeting')
+    pipe.incr('visitor_count')
+    pipe.get('visitor_count')
+    pipe.delete('greeting')
+    pipe.exists('greeting')
+    _, value, _, count, _, exists = pipe.execute()
+
+    print(value.decode('utf-8'))
+    print(f"Visitor count: {count.decode('utf-8')}")
+    print(f"Does 'greeting' exist? {exists}")
+
 # Call the function to execute Redis operations
 if __name__ == "__main__":
     redis_operations()
@@ -1,33 +1,580 @@
 
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+
 import redis
+import redis.asyncio
+
+GREETING = 'Hello, Redis!'
+
+logger = logging.getLogger(__name__)
+
+# Shared connection pool, configured from the environment unless overridden
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', '50'))
+REDIS_POOL_TIMEOUT = float(os.environ.get('REDIS_POOL_TIMEOUT', '5'))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get('REDIS_HEALTH_CHECK_INTERVAL', '30'))
+
+_pool = None
+_client = None
+_pool_lock = threading.Lock()
+
+def create_connection_pool(url=None, max_connections=None, timeout=None, health_check_interval=None):
+    """
+    Creates a bounded, thread-safe connection pool.
+
+    When all max_connections are in use, callers wait up to timeout seconds
+    for one to be returned instead of opening more. Connections idle for
+    longer than health_check_interval seconds are checked with PING before
+    reuse. Arguments default to the REDIS_* environment settings.
+    """
+    return redis.BlockingConnectionPool.from_url(
+        url or REDIS_URL,
+        max_connections=max_connections or REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT if timeout is None else timeout,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL if health_check_interval is None else health_check_interval,
+    )
+
+def get_connection_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_connection_pool()
+    return _pool
+
+def set_connection_pool(pool):
+    """Replaces the process-wide connection pool, disconnecting the old one."""
+    global _pool, _client
+    with _pool_lock:
+        old, _pool, _client = _pool, pool, None
+    if old is not None and old is not pool:
+        old.disconnect()
+
+def get_redis_client(redis_client=None, pool=None):
+    """Returns redis_client, or a client on pool (default: one client shared on the shared pool)."""
+    global _client
+    if redis_client is not None:
+        return redis_client
+    if pool is not None:
+        return redis.Redis(connection_pool=pool)
+    client = _client
+    if client is None:
+        # Building a redis.Redis costs far more than a cached read, so the
+        # shared pool gets one thread-safe client
+        pool = get_connection_pool()
+        with _pool_lock:
+            if _client is None and _pool is pool:
+                _client = redis.Redis(connection_pool=pool)
+            client = _client or redis.Redis(connection_pool=pool)
+    return client
+
+# redis.asyncio connections belong to the event loop that opened them, so the
+# async pool (and a client on it) is shared per loop
+_async_pools = {}
+_async_clients = {}
+
+def create_async_connection_pool(url=None, max_connections=None, timeout=None, health_check_interval=None):
+    """Async counterpart of create_connection_pool(), with the same defaults."""
+    return redis.asyncio.BlockingConnectionPool.from_url(
+        url or REDIS_URL,
+        max_connections=max_connections or REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT if timeout is None else timeout,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL if health_check_interval is None else health_check_interval,
+    )
+
+def get_async_connection_pool():
+    """Returns the async connection pool of the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None:
+        # Forget the pools of loops that have been closed (e.g. by earlier asyncio.run calls)
+        for closed in [other for other in _async_pools if other.is_closed()]:
+            del _async_pools[closed]
+            _async_clients.pop(closed, None)
+        pool = _async_pools[loop] = create_async_connection_pool()
+    return pool
+
+def set_async_connection_pool(pool):
+    """Replaces the running event loop's async connection pool."""
+    loop = asyncio.get_running_loop()
+    _async_pools[loop] = pool
+    _async_clients.pop(loop, None)
+
+def get_async_redis_client(redis_client=None, pool=None):
+    """Returns redis_client, or an async client on pool (default: one client shared on the loop's pool)."""
+    if redis_client is not None:
+        return redis_client
+    if pool is not None:
+        return redis.asyncio.Redis(connection_pool=pool)
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = redis.asyncio.Redis(connection_pool=get_async_connection_pool())
+    return client
+
+INVALIDATION_CHANNEL = '__redis__:invalidate'
+
+class NearCache:
+    """
+    In-process LRU cache for hot Redis keys, kept coherent by server-assisted client tracking.
+
+    Only keys starting with one of prefixes are cached. A background thread
+    holds two extra connections to the client's server: one subscribed to
+    __redis__:invalidate, and one that enabled CLIENT TRACKING in broadcast
+    mode for the prefixes, redirected to the first. Whenever any client
+    changes a tracked key, Redis publishes its name and the entry is
+    dropped. Entries also expire after ttl seconds, which bounds staleness
+    if an invalidation is ever missed.
+
+    Writes made through this process should call invalidate() so that its
+    own reads see them immediately, without waiting for the invalidation
+    message. While tracking is not established (server without CLIENT
+    TRACKING, lost connection) every read goes to Redis.
+
+    Every health_check_interval seconds the tracking connection is asked
+    for CLIENT TRACKINGINFO, and tracking is re-established if its redirect
+    broke. Redis 6.0 lacks that command, so there the check is skipped and
+    only a dropped connection or ttl ends a stale entry.
+
+    Example:
+        cache = NearCache(prefixes=['greeting'], maxsize=1000, ttl=30)
+        greeting = read_greeting(near_cache=cache)
+    """
+
+    def __init__(self, redis_client=None, prefixes=('greeting',), maxsize=1024, ttl=60.0, pool=None,
+                 health_check_interval=5.0):
+        self.redis_client = get_redis_client(redis_client, pool)
+        self.prefixes = tuple(prefixes)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.health_check_interval = health_check_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a read only fills the cache if no
+        # invalidation happened while it was in flight
+        self._epoch = 0
+        self._enabled = False
+        self._can_check_tracking = True
+        self._connections = []
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='redis-near-cache', daemon=True)
+        self._thread.start()
+
+    def get(self, key, redis_client=None):
+        """Returns the value of key, from memory if cached."""
+        if not key.startswith(self.prefixes):
+            return (redis_client or self.redis_client).get(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            epoch = self._epoch
+            self.misses += 1
+        value = (redis_client or self.redis_client).get(key)
+        with self._lock:
+            if self._enabled and self._epoch == epoch:
+                self._entries[key] = (value, now + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *keys):
+        """Drops keys (or, with no arguments, everything) from the cache."""
+        with self._lock:
+            self._epoch += 1
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def close(self):
+        self._closed.set()
+        self._thread.join()
+
+    def _new_connection(self):
+        # Dedicated RESP2 connections, opened like the pool opens its own, so
+        # invalidations arrive as ordinary Pub/Sub messages
+        pool = self.redis_client.connection_pool
+        kwargs = dict(pool.connection_kwargs, protocol=2)
+        # RESP3-only settings that newer redis-py pools add
+        for key in ('maint_notifications_config', 'maint_notifications_pool_handler'):
+            if key in kwargs:
+                kwargs[key] = None
+        connection = pool.connection_class(**kwargs)
+        self._connections.append(connection)
+        return connection
+
+    def _connect(self):
+        listener = self._new_connection()
+        listener.send_command('CLIENT', 'ID')
+        listener_id = listener.read_response()
+        listener.send_command('SUBSCRIBE', INVALIDATION_CHANNEL)
+        listener.read_response()
+
+        tracker = self._new_connection()
+        prefix_args = [arg for prefix in self.prefixes for arg in ('PREFIX', prefix)]
+        tracker.send_command('CLIENT', 'TRACKING', 'ON', 'REDIRECT', listener_id, 'BCAST', *prefix_args)
+        tracker.read_response()
+        return listener, tracker
+
+    def _disconnect(self):
+        with self._lock:
+            self._enabled = False
+        self.invalidate()
+        for connection in self._connections:
+            # Dropping the socket also ends the tracking and the subscription
+            connection.disconnect()
+        self._connections = []
+
+    def _tracking_broken(self, tracker):
+        if not self._can_check_tracking:
+            return False
+        tracker.send_command('CLIENT', 'TRACKINGINFO')
+        try:
+            info = tracker.read_response()
+        except redis.ResponseError as e:
+            # CLIENT TRACKINGINFO is new in Redis 6.2; on 6.0 it is an
+            # unknown subcommand, which says nothing about the tracking
+            if 'unknown' not in str(e).lower():
+                raise
+            logger.info('Server cannot report client tracking state, skipping health checks: %s', e)
+            self._can_check_tracking = False
+            return False
+        # ['flags', [...], 'redirect', id, 'prefixes', [...]]
+        flags = {flag.decode('utf-8') if isinstance(flag, bytes) else flag for flag in info[1]}
+        return 'broken_redirect' in flags or 'off' in flags
+
+    def _run(self):
+        backoff = 0.1
+        while not self._closed.is_set():
+            try:
+                listener, tracker = self._connect()
+                with self._lock:
+                    self._enabled = True
+                backoff = 0.1
+                next_check = time.monotonic() + self.health_check_interval
+                while not self._closed.is_set():
+                    if listener.can_read(timeout=0.5):
+                        self._handle(listener.read_response())
+                    if time.monotonic() >= next_check:
+                        if self._tracking_broken(tracker):
+                            raise redis.ConnectionError('Client tracking redirect is broken')
+                        next_check = time.monotonic() + self.health_check_interval
+            except Exception as e:
+                logger.warning('Near cache disabled until client tracking is re-established: %s', e)
+                self._disconnect()
+                self._closed.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+        self._disconnect()
+
+    def _handle(self, message):
+        kind, channel, keys = message
+        if kind not in (b'message', 'message'):
+            return
+        if keys is None:
+            # FLUSHDB / FLUSHALL
+            self.invalidate()
+        else:
+            self.invalidate(*[key.decode('utf-8') if isinstance(key, bytes) else key for key in keys])
+
+# INCRBY guarded by a per-flush marker key, so retrying a flush whose reply
+# was lost cannot apply it twice
+_APPLY_ONCE_SCRIPT = """
+if redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[2]) then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return tonumber(redis.call('GET', KEYS[1]) or '0')
+"""
+FLUSH_MARKER_TTL = 24 * 60 * 60
 
-def redis_operations():
-    # Create a Redis client
-    redis_client = redis.Redis(host='localhost', port=6379, db=0)
+_counters = weakref.WeakSet()
+
+class BufferedCounter:
+    """
+    Counter that adds increments up in memory and writes them with one INCRBY per flush.
+
+    incr() only touches a local total. A background thread flushes it every
+    flush_interval seconds, or as soon as flush_threshold increments are
+    pending, so the key sees one write per interval per process instead of
+    one per visit. Each flush carries a unique marker checked in the same
+    Lua script as the INCRBY, and a flush that fails is retried with the
+    same marker before anything newer is sent, so every increment is applied
+    exactly once. close() (also run at exit) flushes what is left.
+
+    value() is eventually consistent: the last total seen in Redis plus this
+    process's unflushed increments. That total comes back from every flush,
+    and an interval with nothing to flush re-reads the key instead, so
+    increments from other processes show up within about flush_interval.
+    value(exact=True) flushes and reads the key.
+
+    Example:
+        counter = BufferedCounter('visitor_count', flush_interval=1.0)
+        counter.incr()
+        visitors = counter.value()
+    """
+
+    def __init__(self, key='visitor_count', redis_client=None, pool=None, flush_interval=1.0, flush_threshold=1000,
+                 retry_backoff=0.1):
+        self.key = key
+        self.redis_client = get_redis_client(redis_client, pool)
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.retry_backoff = retry_backoff
+        self.flushes = 0
+        self._apply_once = self.redis_client.register_script(_APPLY_ONCE_SCRIPT)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start()
+        _counters.add(self)
+        atexit.register(self.close)
+
+    def _start(self):
+        self._pending = 0
+        self._in_flight = None
+        self._server_value = None
+        self._sequence = 0
+        self._process_id = uuid.uuid4().hex
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f'counter-{self.key}', daemon=True)
+        self._thread.start()
+
+    def incr(self, amount=1):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('BufferedCounter is closed')
+            self._pending += amount
+            if self._pending >= self.flush_threshold:
+                self._wakeup.set()
+
+    def value(self, exact=False):
+        """Current count; exact=True flushes first and reads Redis."""
+        if exact:
+            self.flush()
+            return int(self.redis_client.get(self.key) or 0)
+        with self._lock:
+            unflushed = self._pending + (self._in_flight[1] if self._in_flight else 0)
+            server_value = self._server_value
+        if server_value is None:
+            server_value = int(self.redis_client.get(self.key) or 0)
+            with self._lock:
+                if self._server_value is None:
+                    self._server_value = server_value
+        return server_value + unflushed
+
+    def flush(self):
+        """Writes pending increments to Redis; raises (keeping them for the next flush) if Redis fails."""
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if self._in_flight is None:
+                        if not self._pending:
+                            return
+                        self._sequence += 1
+                        # The hash tag keeps the marker in the counter's cluster slot
+                        marker = f'{{{self.key}}}:flushed:{self._process_id}:{self._sequence}'
+                        self._in_flight = (marker, self._pending)
+                        self._pending = 0
+                    marker, amount = self._in_flight
+                total = self._apply_once(keys=[self.key, marker], args=[amount, FLUSH_MARKER_TTL])
+                with self._lock:
+                    self._in_flight = None
+                    self._server_value = int(total)
+                    self.flushes += 1
+
+    def _refresh(self):
+        # Only once value() has been asked for; a write-only counter never reads
+        with self._flush_lock:
+            with self._lock:
+                if self._server_value is None or self._in_flight:
+                    return
+            total = int(self.redis_client.get(self.key) or 0)
+            with self._lock:
+                self._server_value = total
+
+    def _run(self):
+        delay = self.flush_interval
+        while not self._closed:
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+            try:
+                flushes = self.flushes
+                self.flush()
+                if self.flushes == flushes:
+                    self._refresh()
+                delay = self.flush_interval
+            except Exception as e:
+                logger.warning('Flushing counter %s failed, will retry: %s', self.key, e)
+                delay = min(max(delay * 2, self.retry_backoff), 30.0)
+
+    def close(self, timeout=10.0):
+        """Stops the flusher and flushes what is left, retrying for up to timeout seconds."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        atexit.unregister(self.close)
+        deadline = time.monotonic() + timeout
+        backoff = self.retry_backoff
+        while True:
+            try:
+                self.flush()
+                return
+            except Exception as e:
+                if time.monotonic() + backoff > deadline:
+                    with self._lock:
+                        lost = self._pending + (self._in_flight[1] if self._in_flight else 0)
+                    logger.error('Could not flush %d increments of counter %s: %s', lost, self.key, e)
+                    return
+                time.sleep(backoff)
+                backoff *= 2
+
+    def _after_fork(self):
+        # The child starts with nothing pending (the parent flushes its own)
+        # and needs its own locks and flusher thread
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start()
+
+def _reset_counters_after_fork():
+    for counter in list(_counters):
+        if not counter._closed:
+            counter._after_fork()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_counters_after_fork)
+
+def _operation_results(value, count, exists):
+    return {
+        "greeting": value.decode('utf-8') if value else None,
+        "visitor_count": count.decode('utf-8') if count else '0',
+        "greeting_exists_after_delete": bool(exists)
+    }
+
+def redis_operations(redis_client=None, pool=None, near_cache=None, counter=None):
+    # Use the given client, or borrow a connection from the shared pool
+    redis_client = get_redis_client(redis_client, pool)
 
     # Set a key-value pair
-    redis_client.set('greeting', 'Hello, Redis!')
+    redis_client.set('greeting', GREETING)
+    if near_cache is not None:
+        near_cache.invalidate('greeting')
 
     # Get the value for a key
-    value = redis_client.get('greeting')
-    greeting = value.decode('utf-8') if value else None
+    value = near_cache.get('greeting', redis_client) if near_cache is not None else redis_client.get('greeting')
 
-    # Increment a counter
-    redis_client.incr('visitor_count')
+    if counter is not None:
+        # Count the visit locally; it reaches Redis with the next flush
+        counter.incr()
+        count = str(counter.value()).encode('utf-8')
+    else:
+        # Increment a counter
+        redis_client.incr('visitor_count')
 
-    # Get the current count
-    count = redis_client.get('visitor_count')
-    visitor_count = count.decode('utf-8') if count else '0'
+        # Get the current count
+        count = redis_client.get('visitor_count')
 
     # Delete a key
     redis_client.delete('greeting')
+    if near_cache is not None:
+        near_cache.invalidate('greeting')
 
     # Check if a key exists
     exists = redis_client.exists('greeting')
 
     # Return results for Benchify to capture
+    return _operation_results(value, count, exists)
+
+def read_greeting(redis_client=None, pool=None, near_cache=None):
+    """Reads the greeting, from near_cache when one is given."""
+    redis_client = get_redis_client(redis_client, pool)
+    value = near_cache.get('greeting', redis_client) if near_cache is not None else redis_client.get('greeting')
+    return value.decode('utf-8') if value else None
+
+def _queue_operations(pipe, greeting_key='greeting', counter_key='visitor_count'):
+    pipe.set(greeting_key, GREETING)
+    pipe.get(greeting_key)
+    pipe.incr(counter_key)
+    pipe.get(counter_key)
+    pipe.delete(greeting_key)
+    pipe.exists(greeting_key)
+
+def redis_operations_pipelined(redis_client=None, transaction=False, pool=None):
+    """
+    Same commands and result as redis_operations(), sent in one round-trip.
+
+    With transaction=True the commands are wrapped in MULTI/EXEC, so no other
+    client can run commands between them.
+    """
+    redis_client = get_redis_client(redis_client, pool)
+    pipe = redis_client.pipeline(transaction=transaction)
+    _queue_operations(pipe)
+    _, value, _, count, _, exists = pipe.execute()
+    return _operation_results(value, count, exists)
+
+def redis_operations_bulk(keys, redis_client=None, transaction=False, pool=None):
+    """
+    Runs the greeting/visitor-counter workflow for many keys in one pipeline.
+
+    Key k uses 'greeting:k' and 'visitor_count:k'. Returns a dict mapping each
+    key to the same result dict redis_operations() returns.
+    """
+    redis_client = get_redis_client(redis_client, pool)
+    keys = list(keys)
+    pipe = redis_client.pipeline(transaction=transaction)
+    for key in keys:
+        _queue_operations(pipe, f'greeting:{key}', f'visitor_count:{key}')
+    replies = pipe.execute()
     return {
-        "greeting": greeting,
-        "visitor_count": visitor_count,
-        "greeting_exists_after_delete": bool(exists)
+        key: _operation_results(replies[i * 6 + 1], replies[i * 6 + 3], replies[i * 6 + 5])
+        for i, key in enumerate(keys)
+    }
+
+async def redis_operations_async(redis_client=None, pool=None):
+    """redis_operations() for asyncio; waits on Redis without blocking the event loop."""
+    redis_client = get_async_redis_client(redis_client, pool)
+    await redis_client.set('greeting', GREETING)
+    value = await redis_client.get('greeting')
+    await redis_client.incr('visitor_count')
+    count = await redis_client.get('visitor_count')
+    await redis_client.delete('greeting')
+    exists = await redis_client.exists('greeting')
+    return _operation_results(value, count, exists)
+
+async def redis_operations_pipelined_async(redis_client=None, transaction=False, pool=None):
+    """redis_operations_pipelined() for asyncio."""
+    redis_client = get_async_redis_client(redis_client, pool)
+    async with redis_client.pipeline(transaction=transaction) as pipe:
+        _queue_operations(pipe)
+        _, value, _, count, _, exists = await pipe.execute()
+    return _operation_results(value, count, exists)
+
+async def redis_operations_bulk_async(keys, redis_client=None, transaction=False, pool=None):
+    """redis_operations_bulk() for asyncio."""
+    redis_client = get_async_redis_client(redis_client, pool)
+    keys = list(keys)
+    async with redis_client.pipeline(transaction=transaction) as pipe:
+        for key in keys:
+            _queue_operations(pipe, f'greeting:{key}', f'visitor_count:{key}')
+        replies = await pipe.execute()
+    return {
+        key: _operation_results(replies[i * 6 + 1], replies[i * 6 + 3], replies[i * 6 + 5])
+        for i, key in enumerate(keys)
     }